@@ -0,0 +1,91 @@
+#ifndef _BINARY_COO_H_
+#define _BINARY_COO_H_
+
+#include <fcntl.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include "utils.h"
+
+// Binary cache of a text COO file (graph or matrix), written by coo_cache.py next to the text file as <fileName>.bin
+// Layout: 64-byte header followed by numEntries (row, col) pairs of uint32_t, with the same values as the text file
+
+#define BINARY_COO_MAGIC "PRIMCOO1"
+
+struct BinaryCOOHeader {
+    char magic[8];
+    uint32_t numRows;
+    uint32_t numCols;
+    uint32_t numEntries;
+    uint32_t reserved;
+    uint64_t sourceSize; /* Size of the text file when it was converted */
+    uint64_t sourceMtime; /* Modification time (s) of the text file when it was converted */
+    uint32_t sourceChecksum; /* CRC32 of the text file */
+    uint32_t entriesChecksum; /* CRC32 of the entries */
+    uint8_t padding[16];
+};
+
+struct BinaryCOO {
+    uint32_t numRows;
+    uint32_t numCols;
+    uint32_t numEntries;
+    const uint32_t* entries;
+    void* map;
+    size_t mapSize;
+};
+
+// Maps <fileName>.bin if it exists and matches the size and modification time of the text file. Returns 0 otherwise.
+// The checksums are not verified here, coo_cache.py check does it
+static int openBinaryCOO(const char* fileName, struct BinaryCOO* coo) {
+
+    char binName[4096];
+    snprintf(binName, sizeof(binName), "%s.bin", fileName);
+    int fd = open(binName, O_RDONLY);
+    if(fd < 0) {
+        return 0;
+    }
+    struct stat binStat;
+    if(fstat(fd, &binStat) != 0 || (size_t) binStat.st_size < sizeof(struct BinaryCOOHeader)) {
+        close(fd);
+        return 0;
+    }
+    void* map = mmap(NULL, binStat.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if(map == MAP_FAILED) {
+        return 0;
+    }
+
+    const struct BinaryCOOHeader* header = (const struct BinaryCOOHeader*) map;
+    int valid = memcmp(header->magic, BINARY_COO_MAGIC, 8) == 0
+        && (size_t) binStat.st_size == sizeof(struct BinaryCOOHeader) + (size_t) header->numEntries*2*sizeof(uint32_t);
+    struct stat textStat;
+    if(valid && stat(fileName, &textStat) == 0
+        && ((uint64_t) textStat.st_size != header->sourceSize || (uint64_t) textStat.st_mtime != header->sourceMtime)) {
+        PRINT_WARNING("    Binary cache %s is stale, reading %s instead", binName, fileName);
+        valid = 0;
+    }
+    if(!valid) {
+        munmap(map, binStat.st_size);
+        return 0;
+    }
+
+    coo->numRows = header->numRows;
+    coo->numCols = header->numCols;
+    coo->numEntries = header->numEntries;
+    coo->entries = (const uint32_t*) (header + 1);
+    coo->map = map;
+    coo->mapSize = binStat.st_size;
+    return 1;
+
+}
+
+static void closeBinaryCOO(struct BinaryCOO* coo) {
+    munmap(coo->map, coo->mapSize);
+}
+
+#endif
+
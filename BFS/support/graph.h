@@ -5,6 +5,7 @@
 #include <assert.h>
 #include <stdio.h>
 
+#include "binary-coo.h"
 #include "common.h"
 #include "utils.h"
 
@@ -27,10 +28,18 @@ static struct COOGraph readCOOGraph(const char* fileName) {
     struct COOGraph cooGraph;
 
     // Initialize fields
-    FILE* fp = fopen(fileName, "r");
+    struct BinaryCOO bin;
+    int binary = openBinaryCOO(fileName, &bin);
+    FILE* fp = NULL;
     uint32_t numNodes, numCols;
-    assert(fscanf(fp, "%u", &numNodes));
-    assert(fscanf(fp, "%u", &numCols));
+    if(binary) {
+        numNodes = bin.numRows;
+        numCols = bin.numCols;
+    } else {
+        fp = fopen(fileName, "r");
+        assert(fscanf(fp, "%u", &numNodes));
+        assert(fscanf(fp, "%u", &numCols));
+    }
     if(numNodes == numCols) {
         cooGraph.numNodes = numNodes;
     } else {
@@ -42,11 +51,23 @@ static struct COOGraph readCOOGraph(const char* fileName) {
         cooGraph.numNodes += (64 - cooGraph.numNodes%64);
         PRINT_WARNING("        Padding to %u which is a multiple of 64 nodes.", cooGraph.numNodes);
     }
-    assert(fscanf(fp, "%u", &cooGraph.numEdges));
+    if(binary) {
+        cooGraph.numEdges = bin.numEntries;
+    } else {
+        assert(fscanf(fp, "%u", &cooGraph.numEdges));
+    }
     cooGraph.nodeIdxs = (uint32_t*) malloc(cooGraph.numEdges*sizeof(uint32_t));
     cooGraph.neighborIdxs = (uint32_t*) malloc(cooGraph.numEdges*sizeof(uint32_t));
 
     // Read the neighborIdxs
+    if(binary) {
+        for(uint32_t edgeIdx = 0; edgeIdx < cooGraph.numEdges; ++edgeIdx) {
+            cooGraph.nodeIdxs[edgeIdx] = bin.entries[2*edgeIdx];
+            cooGraph.neighborIdxs[edgeIdx] = bin.entries[2*edgeIdx + 1];
+        }
+        closeBinaryCOO(&bin);
+        return cooGraph;
+    }
     for(uint32_t edgeIdx = 0; edgeIdx < cooGraph.numEdges; ++edgeIdx) {
         uint32_t nodeIdx;
         assert(fscanf(fp, "%u", &nodeIdx));
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK = 1 << 20 # Queries searched per call to np.searchsorted
+
 def binary_search(arr, search):
     
     L = 0
@@ -18,4 +23,29 @@ def binary_search(arr, search):
         else:
             return m
     
-    return -2 #Error code 2
\ No newline at end of file
+    return -2 #Error code 2
+
+def _search_chunk(arr, querys, res, start, end):
+    # Sorted queries walk arr in order, which is much friendlier to the caches
+    order = np.argsort(querys[start:end])
+    q = querys[start:end][order]
+    pos = np.searchsorted(arr, q)
+    found = pos < len(arr)
+    found[found] = arr[pos[found]] == q[found]
+    res[start + order] = np.where(found, pos, -1)
+
+def batch_search(arr, querys, threads=None, chunk=CHUNK):
+    # Position of each query in the sorted array arr, -1 if it is not found.
+    # Queries are searched in chunks, spread over 'threads' threads
+    # (np.searchsorted releases the GIL); threads=None searches in this thread.
+    arr = np.asarray(arr)
+    querys = np.asarray(querys)
+    res = np.empty(len(querys), dtype=np.int64)
+    bounds = [(s, min(s + chunk, len(querys))) for s in range(0, len(querys), chunk)]
+    if threads is None or threads <= 1:
+        for start, end in bounds:
+            _search_chunk(arr, querys, res, start, end)
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda b: _search_chunk(arr, querys, res, b[0], b[1]), bounds))
+    return res
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
+import os
 import time
 
 #Local Imports
-from cu_lib_import import binary_search as gpu_search
+from cpu_lib import batch_search as cpu_search
 
 # Set an array size to create
 arr_len = 2048576
@@ -16,7 +17,18 @@ arr = np.arange(0, arr_len, 1).astype("i8")
 # Random search querys created
 querys = np.random.randint(1, arr_len, num_querys)
 
-# GPU search function call
+# CPU search function call
 t0 = time.time()
-res_gpu = gpu_search(arr, len(arr), querys, len(querys))
-print("Total GPU Time: %i ms" % ((time.time() - t0)*1e003))
+res_cpu = cpu_search(arr, querys, threads=os.cpu_count())
+print("Total CPU Time: %i ms" % ((time.time() - t0)*1e003))
+assert (res_cpu >= 0).all() and (arr[res_cpu] == querys).all()
+
+# GPU search function call
+try:
+    from cu_lib_import import binary_search as gpu_search
+except OSError:
+    print("GPU library not built, run make")
+else:
+    t0 = time.time()
+    res_gpu = gpu_search(arr, len(arr), querys, len(querys))
+    print("Total GPU Time: %i ms" % ((time.time() - t0)*1e003))
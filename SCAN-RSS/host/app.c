@@ -16,6 +16,7 @@
 #include "../support/common.h"
 #include "../support/timer.h"
 #include "../support/params.h"
+#include "../support/golden.h"
 
 // Define the DPU Binary path as DPU_BINARY here
 #ifndef DPU_BINARY
@@ -88,6 +89,14 @@ int main(int argc, char **argv) {
     // Create an input file with arbitrary data
     read_input(A, input_size, input_size_dpu_round * nr_of_dpus);
 
+    // Golden output: checked instead of recomputing the output on CPU, full check if it is missing
+    struct Golden golden;
+    int check = p.check;
+    if(check != CHECK_FULL && (p.golden_file == NULL || !openGolden(p.golden_file, sizeof(T), input_size, &golden))) {
+        printf("No golden output %s, full check\n", p.golden_file ? p.golden_file : "");
+        check = CHECK_FULL;
+    }
+
     // Timer declaration
     Timer timer;
 
@@ -97,11 +106,13 @@ int main(int argc, char **argv) {
     for(int rep = 0; rep < p.n_warmup + p.n_reps; rep++) {
 
         // Compute output on CPU (performance comparison and verification purposes)
-        if(rep >= p.n_warmup)
-            start(&timer, 0, rep - p.n_warmup);
-        scan_host(C, A, input_size);
-        if(rep >= p.n_warmup)
-            stop(&timer, 0);
+        if(check == CHECK_FULL) {
+            if(rep >= p.n_warmup)
+                start(&timer, 0, rep - p.n_warmup);
+            scan_host(C, A, input_size);
+            if(rep >= p.n_warmup)
+                stop(&timer, 0);
+        }
 
         printf("Load input data\n");
         if(rep >= p.n_warmup)
@@ -244,8 +255,10 @@ int main(int argc, char **argv) {
     }
 
     // Print timing results
-    printf("CPU ");
-    print(&timer, 0, p.n_reps);
+    if(check == CHECK_FULL) {
+        printf("CPU ");
+        print(&timer, 0, p.n_reps);
+    }
     printf("CPU-DPU ");
     print(&timer, 1, p.n_reps);
     printf("DPU Kernel Reduction ");
@@ -266,13 +279,20 @@ int main(int argc, char **argv) {
 
     // Check output
     bool status = true;
-    for (i = 0; i < input_size; i++) {
-        if(C[i] != bufferC[i]){ 
-            status = false;
+    if(check == CHECK_FULL) {
+        for (i = 0; i < input_size; i++) {
+            if(C[i] != bufferC[i]){ 
+                status = false;
 #if PRINT
-            printf("%d: %lu -- %lu\n", i, C[i], bufferC[i]);
+                printf("%d: %lu -- %lu\n", i, C[i], bufferC[i]);
 #endif
+            }
         }
+        if(status && p.golden_file != NULL)
+            writeGolden(p.golden_file, C, sizeof(T), input_size, 0);
+    } else {
+        status = checkGolden(&golden, bufferC, sizeof(T), check);
+        closeGolden(&golden);
     }
     if (status) {
         printf("[" ANSI_COLOR_GREEN "OK" ANSI_COLOR_RESET "] Outputs are equal\n");
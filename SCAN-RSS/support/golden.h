@@ -0,0 +1,164 @@
+#ifndef _GOLDEN_H_
+#define _GOLDEN_H_
+
+#include <fcntl.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <time.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+// Golden output of the host program: the output of the CPU reference for one input, cached by golden.py and passed with -g <file>
+// Layout: 64-byte header followed by numElems elements of elemSize bytes
+// A full check (-c 0) writes the file if it is missing. A hash (-c 1) or sample (-c 2) check compares the DPU output
+// with the mapped file instead of recomputing the CPU reference
+
+#define GOLDEN_MAGIC "PRIMGLD1"
+#define GOLDEN_SAMPLES 4096 // Elements compared by a sample check
+
+enum check_mode {
+    CHECK_FULL = 0,
+    CHECK_HASH = 1,
+    CHECK_SAMPLE = 2,
+};
+
+struct GoldenHeader {
+    char magic[8];
+    uint32_t elemSize;
+    uint32_t reserved;
+    uint64_t numElems;
+    uint64_t seed; /* Seed of the input (srand) */
+    uint64_t hash; /* goldenHash() of the elements */
+    uint8_t padding[24];
+};
+
+struct Golden {
+    uint64_t numElems;
+    uint64_t hash;
+    const uint8_t* elems;
+    void* map;
+    size_t mapSize;
+};
+
+// Sum of the 64-bit words (the last one zero-padded) times odd weights, so that any change of one element changes the sum,
+// then mixed with the size (splitmix64 finalizer). Must match golden.py
+static uint64_t goldenHash(const void* data, size_t bytes) {
+    const uint8_t* b = (const uint8_t*) data;
+    size_t words = bytes / 8;
+    uint64_t h = 0;
+    uint64_t w;
+    for(size_t i = 0; i < words; i++) {
+        memcpy(&w, b + 8*i, 8);
+        h += w * (2*i + 1);
+    }
+    if(bytes % 8) {
+        w = 0;
+        memcpy(&w, b + 8*words, bytes % 8);
+        h += w * (2*words + 1);
+    }
+    h ^= bytes;
+    h = (h ^ (h >> 30)) * 0xbf58476d1ce4e5b9ULL;
+    h = (h ^ (h >> 27)) * 0x94d049bb133111ebULL;
+    return h ^ (h >> 31);
+}
+
+// Maps the golden output if it exists and holds numElems elements of elemSize bytes. Returns 0 otherwise.
+static int openGolden(const char* fileName, size_t elemSize, uint64_t numElems, struct Golden* golden) {
+
+    int fd = open(fileName, O_RDONLY);
+    if(fd < 0) {
+        return 0;
+    }
+    struct stat st;
+    if(fstat(fd, &st) != 0 || (size_t) st.st_size != sizeof(struct GoldenHeader) + numElems*elemSize) {
+        close(fd);
+        return 0;
+    }
+    void* map = mmap(NULL, st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if(map == MAP_FAILED) {
+        return 0;
+    }
+
+    const struct GoldenHeader* header = (const struct GoldenHeader*) map;
+    if(memcmp(header->magic, GOLDEN_MAGIC, 8) != 0 || header->elemSize != elemSize || header->numElems != numElems) {
+        munmap(map, st.st_size);
+        return 0;
+    }
+
+    golden->numElems = header->numElems;
+    golden->hash = header->hash;
+    golden->elems = (const uint8_t*) (header + 1);
+    golden->map = map;
+    golden->mapSize = st.st_size;
+    return 1;
+
+}
+
+static void closeGolden(struct Golden* golden) {
+    munmap(golden->map, golden->mapSize);
+}
+
+// Writes the golden output unless a valid one exists. The file is renamed into place, concurrent runs may write it
+static void writeGolden(const char* fileName, const void* elems, size_t elemSize, uint64_t numElems, uint64_t seed) {
+
+    struct Golden golden;
+    if(openGolden(fileName, elemSize, numElems, &golden)) {
+        closeGolden(&golden);
+        return;
+    }
+    char tmpName[4096];
+    snprintf(tmpName, sizeof(tmpName), "%s.tmp.%d", fileName, (int) getpid());
+    FILE* fp = fopen(tmpName, "wb");
+    if(fp == NULL) {
+        fprintf(stderr, "Cannot write golden output %s\n", tmpName);
+        return;
+    }
+    struct GoldenHeader header;
+    memset(&header, 0, sizeof(header));
+    memcpy(header.magic, GOLDEN_MAGIC, 8);
+    header.elemSize = elemSize;
+    header.numElems = numElems;
+    header.seed = seed;
+    header.hash = goldenHash(elems, numElems*elemSize);
+    int ok = fwrite(&header, sizeof(header), 1, fp) == 1 && fwrite(elems, elemSize, numElems, fp) == numElems;
+    ok = fclose(fp) == 0 && ok;
+    if(!ok || rename(tmpName, fileName) != 0) {
+        fprintf(stderr, "Cannot write golden output %s\n", fileName);
+        unlink(tmpName);
+    }
+
+}
+
+// Compares the output with the golden output: its hash, or the last element and GOLDEN_SAMPLES - 1 random ones
+// (different at every run). Returns 1 if they match.
+static int checkGolden(const struct Golden* golden, const void* elems, size_t elemSize, int mode) {
+
+    if(mode == CHECK_HASH) {
+        return goldenHash(elems, golden->numElems*elemSize) == golden->hash;
+    }
+    const uint8_t* out = (const uint8_t*) elems;
+    uint64_t x = ((uint64_t) time(NULL) << 20) ^ (uint64_t) getpid() ^ 1;
+    for(uint64_t s = 0; s < GOLDEN_SAMPLES && s < golden->numElems; s++) {
+        uint64_t i;
+        if(s == 0) {
+            i = golden->numElems - 1;
+        } else if(golden->numElems <= GOLDEN_SAMPLES) {
+            i = s - 1;
+        } else {
+            x ^= x << 13; // xorshift64
+            x ^= x >> 7;
+            x ^= x << 17;
+            i = x % golden->numElems;
+        }
+        if(memcmp(out + i*elemSize, golden->elems + i*elemSize, elemSize) != 0) {
+            return 0;
+        }
+    }
+    return 1;
+
+}
+
+#endif
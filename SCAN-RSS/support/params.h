@@ -8,6 +8,8 @@ typedef struct Params {
     int   n_warmup;
     int   n_reps;
     int  exp;
+    char* golden_file;
+    int   check;
 }Params;
 
 static void usage() {
@@ -19,6 +21,8 @@ static void usage() {
         "\n    -w <W>    # of untimed warmup iterations (default=1)"
         "\n    -e <E>    # of timed repetition iterations (default=3)"
         "\n    -x <X>    Weak (0) or strong (1) scaling (default=0)"
+        "\n    -g <G>    golden output file, written by a full check if missing (default=none)"
+        "\n    -c <C>    check the output: full (0), hash (1) or sample (2) of the golden output (default=0)"
         "\n"
         "\nBenchmark-specific options:"
         "\n    -i <I>    input size (default=3932160 elements)"
@@ -31,9 +35,11 @@ struct Params input_params(int argc, char **argv) {
     p.n_warmup      = 1;
     p.n_reps        = 3;
     p.exp           = 0;
+    p.golden_file   = NULL;
+    p.check         = 0;
 
     int opt;
-    while((opt = getopt(argc, argv, "hi:w:e:x:")) >= 0) {
+    while((opt = getopt(argc, argv, "hi:w:e:x:g:c:")) >= 0) {
         switch(opt) {
         case 'h':
         usage();
@@ -43,6 +49,8 @@ struct Params input_params(int argc, char **argv) {
         case 'w': p.n_warmup      = atoi(optarg); break;
         case 'e': p.n_reps        = atoi(optarg); break;
         case 'x': p.exp           = atoi(optarg); break;
+        case 'g': p.golden_file   = optarg; break;
+        case 'c': p.check         = atoi(optarg); break;
         default:
             fprintf(stderr, "\nUnrecognized option!\n");
             usage();
@@ -5,6 +5,7 @@
 #include <assert.h>
 #include <stdio.h>
 
+#include "binary-coo.h"
 #include "common.h"
 #include "utils.h"
 
@@ -29,18 +30,39 @@ static struct COOMatrix readCOOMatrix(const char* fileName) {
     struct COOMatrix cooMatrix;
 
     // Initialize fields
-    FILE* fp = fopen(fileName, "r");
-    assert(fscanf(fp, "%u", &cooMatrix.numRows));
+    struct BinaryCOO bin;
+    int binary = openBinaryCOO(fileName, &bin);
+    FILE* fp = NULL;
+    if(binary) {
+        cooMatrix.numRows = bin.numRows;
+    } else {
+        fp = fopen(fileName, "r");
+        assert(fscanf(fp, "%u", &cooMatrix.numRows));
+    }
     if(cooMatrix.numRows%2 == 1) {
         PRINT_WARNING("Reading matrix %s: number of rows must be even. Padding with an extra row.", fileName);
         cooMatrix.numRows++;
     }
-    assert(fscanf(fp, "%u", &cooMatrix.numCols));
-    assert(fscanf(fp, "%u", &cooMatrix.numNonzeros));
+    if(binary) {
+        cooMatrix.numCols = bin.numCols;
+        cooMatrix.numNonzeros = bin.numEntries;
+    } else {
+        assert(fscanf(fp, "%u", &cooMatrix.numCols));
+        assert(fscanf(fp, "%u", &cooMatrix.numNonzeros));
+    }
     cooMatrix.rowIdxs = (uint32_t*) malloc(ROUND_UP_TO_MULTIPLE_OF_8(cooMatrix.numNonzeros*sizeof(uint32_t)));
     cooMatrix.nonzeros = (struct Nonzero*) malloc(ROUND_UP_TO_MULTIPLE_OF_8(cooMatrix.numNonzeros*sizeof(struct Nonzero)));
 
     // Read the nonzeros
+    if(binary) {
+        for(uint32_t i = 0; i < cooMatrix.numNonzeros; ++i) {
+            cooMatrix.rowIdxs[i] = bin.entries[2*i] - 1; // File format indexes begin at 1
+            cooMatrix.nonzeros[i].col = bin.entries[2*i + 1] - 1; // File format indexes begin at 1
+            cooMatrix.nonzeros[i].value = 1.0f;
+        }
+        closeBinaryCOO(&bin);
+        return cooMatrix;
+    }
     for(uint32_t i = 0; i < cooMatrix.numNonzeros; ++i) {
         uint32_t rowIdx;
         assert(fscanf(fp, "%u", &rowIdx));
@@ -1,12 +1,11 @@
 import os
 import sys
-import random
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", ".."))
+import inputs
 
-#Generates a random list of floating point values between 0 and 10
-fd = open(sys.argv[2], "w")
-
-for i in range(0, int(sys.argv[1])):
-    fd.write(str(random.randint(0, 1000000000) / float(100000000)) + "\n")
 
-fd.close()
+#Generates a random list of floating point values between 0 and 10
+#Usage: python3 randlist.py NR_ELEMENTS OUTPUT [SEED]
+seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+inputs.write("TS", int(sys.argv[1]), sys.argv[2], seed)
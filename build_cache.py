@@ -0,0 +1,93 @@
+import os
+import shutil
+import hashlib
+import functools
+import subprocess
+
+# Content-addressed cache of built bin/ folders.
+#
+# The key of a build is a hash of the benchmark sources, its Makefile, the
+# macros passed to make and the toolchain (versions of the DPU and host
+# compilers and of the SDK, CC and CFLAGS), so that an SDK or compiler upgrade
+# does not reuse binaries built by the previous one. A hit copies the cached bin/ folder instead of
+# running make. Entries are evicted least-recently-used first once the cache
+# grows beyond its size limit.
+
+SOURCE_DIRS = ["host", "dpu", "support", "baselines/cpu"]
+TOOLCHAIN = [["dpu-upmem-dpurte-clang", "--version"], ["dpu-pkg-config", "--modversion", "dpu"]]
+TOOLCHAIN_ENV = ["CC", "CFLAGS"]
+
+@functools.lru_cache(maxsize=None)
+def toolchain():
+    # Versions of the compilers and the SDK, once per process
+    cc = os.environ.get("CC", "cc")
+    lines = []
+    for cmd in TOOLCHAIN + [[cc, "--version"]]:
+        try:
+            out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=30).stdout.decode(errors="replace")
+        except (OSError, subprocess.TimeoutExpired):
+            out = "missing"
+        lines.append(" ".join(cmd) + ": " + out.strip())
+    for k in TOOLCHAIN_ENV:
+        lines.append(k + "=" + os.environ.get(k, ""))
+    return "\n".join(lines)
+
+def build_key(app_dir, macros):
+    h = hashlib.sha256()
+    files = [os.path.join(app_dir, "Makefile")]
+    for d in SOURCE_DIRS:
+        for path, dirs, names in os.walk(os.path.join(app_dir, d)):
+            dirs.sort()
+            files += [os.path.join(path, n) for n in sorted(names)]
+    for name in files:
+        h.update(os.path.relpath(name, app_dir).encode())
+        with open(name, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    for k, v in macros:
+        h.update(("%s=%s\n" % (k, v)).encode())
+    h.update(toolchain().encode())
+    return h.hexdigest()
+
+def dir_size(path):
+    total = 0
+    for p, dirs, names in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(p, n)) for n in names)
+    return total
+
+def fetch(cache_dir, key, bin_dir):
+    entry = os.path.join(cache_dir, key)
+    if not os.path.isdir(entry):
+        return False
+    shutil.rmtree(bin_dir, ignore_errors=True)
+    shutil.copytree(entry, bin_dir, symlinks=True)
+    os.utime(entry) # LRU: mtime of an entry is its last use
+    return True
+
+def store(cache_dir, key, bin_dir):
+    entry = os.path.join(cache_dir, key)
+    if os.path.isdir(entry):
+        return
+    # Copy aside and rename, so concurrent builders never see a partial entry
+    tmp = entry + ".tmp" + str(os.getpid())
+    shutil.copytree(bin_dir, tmp, symlinks=True)
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def evict(cache_dir, max_bytes):
+    entries = []
+    for key in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, key)
+        if os.path.isdir(entry) and ".tmp" not in key:
+            entries.append((os.path.getmtime(entry), dir_size(entry), entry))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for mtime, size, entry in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted += 1
+    return evicted
@@ -0,0 +1,107 @@
+import os
+import sys
+import argparse
+
+import results
+import stats
+
+# Compares the CPU-DPU, DPU Kernel and DPU-CPU times of two sets of profile
+# files (e.g., before and after an SDK upgrade), configuration by
+# configuration: (app, sweep, dpus, tasklets, bl, size). Each side is either a
+# repo (or a copy of it) with <app>/profile folders, or one profile folder.
+#
+# The per-run times of both sides are compared with a Mann-Whitney U test,
+# with Benjamini-Hochberg correction over all the comparisons. A change is a
+# regression (or improvement) when its q-value is below --alpha and the median
+# changes by more than --threshold. Configurations with fewer than
+# --min-samples runs on a side cannot be tested: their changes above the
+# threshold are marked with '?' and only fail the comparison with --strict.
+#
+# Usage: python3 compare.py OLD NEW [--threshold 0.05] [--alpha 0.05] [--all]
+# Exit code 1 if there is any regression.
+
+PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+THRESHOLD = 0.05
+ALPHA = 0.05
+MIN_SAMPLES = 3
+
+def profile_paths(path):
+    # Profile files of a repo, or of a single <app>/profile folder
+    path = os.path.abspath(path)
+    if any(results.parse_profile_name(n) is not None for n in os.listdir(path)):
+        for name in sorted(os.listdir(path)):
+            if results.parse_profile_name(name) is not None:
+                yield os.path.join(path, name)
+        return
+    for prof in results.profile_files(path):
+        yield prof
+
+def timings(path, phases=PHASES):
+    # {(app, sweep, dpus, tasklets, bl, size, phase): [ms]}
+    out = {}
+    for prof in profile_paths(path):
+        for r in results.parse_file(prof):
+            if r.phase in phases:
+                out.setdefault((r.app, r.sweep, r.dpus, r.tasklets, r.bl, r.size, r.phase), []).append(r.ms)
+    return out
+
+def compare(old, new, threshold=THRESHOLD, alpha=ALPHA, min_samples=MIN_SAMPLES):
+    # Returns one row per key found on both sides, ranked from the worst regression
+    # to the best improvement
+    rows = []
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key], new[key]
+        m_old, m_new = stats.median(a), stats.median(b)
+        change = m_new / m_old - 1 if m_old > 0 else float("nan")
+        testable = len(a) >= min_samples and len(b) >= min_samples
+        p = stats.mann_whitney(a, b)[1] if testable else float("nan")
+        rows.append({"key" : key, "n_old" : len(a), "n_new" : len(b), "old" : m_old, "new" : m_new, "change" : change, "p" : p, "testable" : testable})
+    for row, q in zip(rows, stats.fdr([r["p"] for r in rows])):
+        row["q"] = q
+        verdict = ""
+        if row["change"] > threshold:
+            verdict = "REGRESSION"
+        elif row["change"] < -threshold:
+            verdict = "IMPROVEMENT"
+        if verdict and not row["testable"]:
+            verdict += "?"
+        elif verdict and not q < alpha:
+            verdict = ""
+        row["verdict"] = verdict
+    rows.sort(key=lambda r: -r["change"] if r["change"] == r["change"] else 0.0)
+    return rows
+
+def report(rows, everything=False, out=sys.stdout):
+    out.write("app\tsweep\tdpus\ttasklets\tbl\tsize\tphase\tn_old\tn_new\told_ms\tnew_ms\tchange\tp\tq\tverdict\n")
+    for r in rows:
+        if not everything and not r["verdict"]:
+            continue
+        out.write("%s\t%s\t%d\t%d\t%d\t%d\t%s\t" % r["key"])
+        out.write("%d\t%d\t%f\t%f\t%+.1f%%\t%.4g\t%.4g\t%s\n" % (r["n_old"], r["n_new"], r["old"], r["new"], 100 * r["change"], r["p"], r["q"], r["verdict"]))
+
+def main():
+    parser = argparse.ArgumentParser(usage="python3 compare.py OLD NEW [options]")
+    parser.add_argument("old", help="repo or profile folder of the reference sweep")
+    parser.add_argument("new", help="repo or profile folder of the sweep to check")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative change of the median reported (default 5%%)")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="significance level of the corrected p-values")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES, help="runs per side needed for a test")
+    parser.add_argument("--phase", action="append", default=None, choices=PHASES, help="phases to compare (default: all)")
+    parser.add_argument("--strict", action="store_true", help="untested changes above the threshold also fail")
+    parser.add_argument("--all", action="store_true", help="print every configuration, not only the changes")
+    args = parser.parse_args()
+
+    phases = args.phase or PHASES
+    old = timings(args.old, phases)
+    new = timings(args.new, phases)
+    rows = compare(old, new, args.threshold, args.alpha, args.min_samples)
+    report(rows, args.all)
+
+    regressions = [r for r in rows if r["verdict"] == "REGRESSION" or (args.strict and r["verdict"] == "REGRESSION?")]
+    sys.stderr.write("%d configuration(s) compared, %d only in %s, %d only in %s, %d regression(s), %d improvement(s)\n" % (
+        len(rows), len(set(old) - set(new)), args.old, len(set(new) - set(old)), args.new, len(regressions),
+        sum(1 for r in rows if r["verdict"].startswith("IMPROVEMENT"))))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
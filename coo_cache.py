@@ -0,0 +1,171 @@
+import os
+import sys
+import zlib
+import struct
+
+import numpy as np
+
+# Binary cache of the text COO inputs of BFS (BFS/data, rMat graphs) and SpMV
+# (SpMV/data, .mtx files). The text format is
+#   numRows numCols numEntries
+#   row col
+#   ...
+# and the cache <file>.bin holds a 64-byte header followed by the (row, col)
+# pairs as little-endian uint32, with the same values as the text file. The
+# host programs map the cache (support/binary-coo.h) instead of parsing the
+# text file, and fall back to the text file when the cache is stale (the
+# size or modification time of the text file changed). Only check verifies
+# the CRC32 of the text file and of the entries.
+#
+# Usage: python3 coo_cache.py convert FILE...
+#        python3 coo_cache.py check FILE...
+
+MAGIC = b"PRIMCOO1"
+HEADER = struct.Struct("<8s4I2Q2I16x") # Must match struct BinaryCOOHeader
+BLOCK = 64 << 20
+
+def cache_path(path):
+    return path + ".bin"
+
+def read_header(bin_path):
+    with open(bin_path, "rb") as f:
+        magic, rows, cols, entries, _, src_size, src_mtime, src_crc, entries_crc = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(bin_path + " is not a binary COO file")
+    return {"rows" : rows, "cols" : cols, "entries" : entries, "source_size" : src_size,
+            "source_mtime" : src_mtime, "source_crc" : src_crc, "entries_crc" : entries_crc}
+
+def load(bin_path):
+    # Returns (header, entries) where entries is a read-only (numEntries, 2) memmap
+    header = read_header(bin_path)
+    entries = np.memmap(bin_path, dtype="<u4", mode="r", offset=HEADER.size, shape=(header["entries"], 2))
+    return header, entries
+
+def write(bin_path, rows, cols, chunks, source=None):
+    # chunks: iterable of (n, 2) integer arrays. 'source' describes the text file
+    # the entries come from: (size, mtime, crc32), a function returning it once
+    # the chunks are consumed, or None for generated inputs.
+    tmp = bin_path + ".tmp"
+    n = 0
+    crc = 0
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for c in chunks:
+            c = np.ascontiguousarray(c, dtype="<u4")
+            data = c.tobytes()
+            crc = zlib.crc32(data, crc)
+            f.write(data)
+            n += len(c)
+        if callable(source):
+            source = source()
+        src_size, src_mtime, src_crc = source if source is not None else (0, 0, 0)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, rows, cols, n, 0, src_size, src_mtime, src_crc, crc))
+    os.replace(tmp, bin_path)
+    return n
+
+def read_text(path):
+    # Streams a text COO file: returns (rows, cols, entries, chunk iterator, source info)
+    f = open(path, "rb")
+    state = {"crc" : 0}
+
+    def blocks():
+        rest = b""
+        while True:
+            data = f.read(BLOCK)
+            state["crc"] = zlib.crc32(data, state["crc"])
+            if not data:
+                break
+            data = rest + data
+            cut = max(data.rfind(b"\n"), data.rfind(b" "), data.rfind(b"\t"))
+            if cut < 0:
+                rest = data
+                continue
+            rest = data[cut:]
+            yield data[:cut]
+        if rest.strip():
+            yield rest
+
+    it = blocks()
+    values = np.empty(0, dtype=np.int64)
+    while len(values) < 3:
+        values = np.concatenate([values, np.fromstring(next(it), dtype=np.int64, sep=" ")])
+    rows, cols, entries = values[:3].tolist()
+
+    def chunks():
+        pending = values[3:]
+        while True:
+            even = len(pending) - len(pending) % 2
+            yield pending[:even].reshape(-1, 2)
+            pending = pending[even:]
+            block = next(it, None)
+            if block is None:
+                break
+            pending = np.concatenate([pending, np.fromstring(block, dtype=np.int64, sep=" ")])
+        f.close()
+        if len(pending):
+            raise ValueError(path + ": odd number of indices")
+
+    def source():
+        st = os.stat(path)
+        return st.st_size, int(st.st_mtime), state["crc"]
+
+    return rows, cols, entries, chunks(), source
+
+def convert(path):
+    rows, cols, entries, chunks, source = read_text(path)
+    bin_path = cache_path(path)
+    n = write(bin_path, rows, cols, chunks, source)
+    if n != entries:
+        print ("WARNING: " + path + " declares " + str(entries) + " entries but contains " + str(n))
+    return bin_path, n
+
+def check(path, full=True):
+    # Returns None if the cache of 'path' is valid, the reason why it is not otherwise
+    bin_path = cache_path(path)
+    if not os.path.exists(bin_path):
+        return "missing"
+    try:
+        header = read_header(bin_path)
+    except (ValueError, struct.error) as e:
+        return str(e)
+    if os.path.getsize(bin_path) != HEADER.size + 8 * header["entries"]:
+        return "truncated"
+    if os.path.exists(path):
+        st = os.stat(path)
+        if st.st_size != header["source_size"] or int(st.st_mtime) != header["source_mtime"]:
+            return "stale (text file changed)"
+    if full:
+        crc = 0
+        with open(bin_path, "rb") as f:
+            f.seek(HEADER.size)
+            for data in iter(lambda: f.read(BLOCK), b""):
+                crc = zlib.crc32(data, crc)
+        if crc != header["entries_crc"]:
+            return "corrupt (entries checksum mismatch)"
+        if os.path.exists(path):
+            crc = 0
+            with open(path, "rb") as f:
+                for data in iter(lambda: f.read(BLOCK), b""):
+                    crc = zlib.crc32(data, crc)
+            if crc != header["source_crc"]:
+                return "stale (text file checksum mismatch)"
+    return None
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ["convert", "check"]:
+        print ("Usage: python3 coo_cache.py convert|check FILE...")
+        return 1
+    failed = 0
+    for path in sys.argv[2:]:
+        if sys.argv[1] == "convert":
+            bin_path, n = convert(path)
+            print ("Converted " + path + " -> " + bin_path + " (" + str(n) + " entries)")
+        else:
+            reason = check(path)
+            print (path + ": " + ("ok" if reason is None else reason))
+            failed += reason is not None
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import argparse
+
+import numpy as np
+
+import coo_cache
+
+# Streaming generators of COO inputs for BFS (rMat graphs) and SpMV (sparse
+# matrices), for the weak-scaling experiments of run_weak.py.
+#
+# Edges are generated in fixed-size chunks, so memory stays bounded whatever
+# the size of the output, and written either in the text format read by
+# BFS/support/graph.h and SpMV/support/matrix.h or in the binary format of
+# coo_cache.py (<output>.bin), which the host programs map directly.
+#
+# Usage: python3 coo_generate.py rmat SCALE EDGES OUTPUT [--seed S] [--binary]
+#        python3 coo_generate.py matrix ROWS COLS NNZ_PER_ROW OUTPUT [--seed S] [--binary]
+#        python3 coo_generate.py replicate BASE FACTOR OUTPUT [--binary]
+
+CHUNK = 1 << 22
+RMAT_ABC = (0.5, 0.1, 0.1) # Quadrant probabilities, as in the pbbsbench rMat generator
+
+# Weak scaling: input size per DPU
+NODES_PER_DPU = 1 << 17
+EDGES_PER_DPU = 1200000
+ROWS_PER_DPU = 4096
+NNZ_PER_ROW = 32
+
+def chunk_rng(seed, index):
+    return np.random.default_rng([seed, index])
+
+def scramble(x, scale):
+    # Bijection on [0, 2^scale) that spreads rMat's high-degree nodes over the node range
+    mask = (1 << scale) - 1
+    x = (x * 0x9E3779B1) & mask
+    return x ^ (x >> max(1, scale // 2))
+
+def rmat(scale, edges, seed=0, abc=RMAT_ABC):
+    # Yields (n, 2) chunks of (node, neighbor) pairs of a 2^scale node rMat graph
+    a, b, c = abc
+    for i, start in enumerate(range(0, edges, CHUNK)):
+        n = min(CHUNK, edges - start)
+        rng = chunk_rng(seed, i)
+        src = np.zeros(n, dtype=np.uint64)
+        dst = np.zeros(n, dtype=np.uint64)
+        for bit in range(scale):
+            r = rng.random(n)
+            down = r >= a + b # Quadrants c and d
+            right = ((r >= a) & (r < a + b)) | (r >= a + b + c) # Quadrants b and d
+            src |= down.astype(np.uint64) << np.uint64(bit)
+            dst |= right.astype(np.uint64) << np.uint64(bit)
+        yield np.stack([scramble(src, scale), scramble(dst, scale)], axis=1)
+
+def random_matrix(rows, cols, nnz_per_row, seed=0):
+    # Yields (n, 2) chunks of 1-based (row, col) pairs, nnz_per_row random columns per row
+    rows_per_chunk = max(1, CHUNK // nnz_per_row)
+    for i, first in enumerate(range(0, rows, rows_per_chunk)):
+        n = min(rows_per_chunk, rows - first)
+        rng = chunk_rng(seed, i)
+        r = np.repeat(np.arange(first + 1, first + n + 1, dtype=np.uint64), nnz_per_row)
+        c = rng.integers(1, cols, n * nnz_per_row, endpoint=True).astype(np.uint64)
+        yield np.stack([r, c], axis=1)
+
+def replicate(base, factor):
+    # Same output as SpMV/data/generate/replicate.c, in replica order: the base
+    # matrix stacked 'factor' times along the rows. Returns (rows, cols, chunks).
+    if coo_cache.check(base, full=False) is not None:
+        coo_cache.convert(base)
+    header, entries = coo_cache.load(coo_cache.cache_path(base))
+
+    def chunks():
+        for r in range(factor):
+            for start in range(0, len(entries), CHUNK):
+                c = np.array(entries[start:start + CHUNK], dtype=np.uint64)
+                c[:, 0] += r * header["rows"]
+                yield c
+
+    return header["rows"] * factor, header["cols"], chunks()
+
+def write_text(path, rows, cols, entries, chunks):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write("%d %d %d\n" % (rows, cols, entries))
+        for c in chunks:
+            f.write("%d %d\n" * len(c) % tuple(c.ravel().tolist()))
+    os.replace(tmp, path)
+
+def write(path, rows, cols, entries, chunks, binary=False):
+    # Binary outputs go to <path>.bin: the host programs load it when given -f <path>
+    if binary:
+        coo_cache.write(coo_cache.cache_path(path), rows, cols, chunks)
+    else:
+        write_text(path, rows, cols, entries, chunks)
+    return path
+
+def weak_input(rootdir, app_name, nr_dpus, binary=True, create=True):
+    # Input file of BFS or SpMV for the weak-scaling step with nr_dpus DPUs, generated once
+    out_dir = os.path.join(rootdir, app_name, "data", "weak")
+    if create:
+        os.makedirs(out_dir, exist_ok=True)
+    if app_name == "BFS":
+        scale = (NODES_PER_DPU * nr_dpus - 1).bit_length()
+        edges = EDGES_PER_DPU * nr_dpus
+        path = os.path.join(out_dir, "rmat_dpus" + str(nr_dpus) + ".txt")
+        if create and not os.path.exists(coo_cache.cache_path(path) if binary else path):
+            print ("Generating " + path)
+            write(path, 1 << scale, 1 << scale, edges, rmat(scale, edges), binary)
+        return path
+    if app_name == "SpMV":
+        path = os.path.join(out_dir, "matrix_dpus" + str(nr_dpus) + ".mtx")
+        if create and not os.path.exists(coo_cache.cache_path(path) if binary else path):
+            print ("Generating " + path)
+            base = os.path.join(rootdir, app_name, "data", "bcsstk30.mtx")
+            if os.path.exists(base):
+                rows, cols, chunks = replicate(base, nr_dpus)
+                entries = None if binary else coo_cache.read_header(coo_cache.cache_path(base))["entries"] * nr_dpus
+                write(path, rows, cols, entries, chunks, binary)
+            else:
+                rows = ROWS_PER_DPU * nr_dpus
+                write(path, rows, ROWS_PER_DPU, rows * NNZ_PER_ROW, random_matrix(rows, ROWS_PER_DPU, NNZ_PER_ROW), binary)
+        return path
+    raise ValueError("No weak-scaling input generator for " + app_name)
+
+def main():
+    parser = argparse.ArgumentParser(usage="python3 coo_generate.py rmat|matrix|replicate ...")
+    sub = parser.add_subparsers(dest="kind", required=True)
+    p = sub.add_parser("rmat")
+    p.add_argument("scale", type=int)
+    p.add_argument("edges", type=int)
+    p.add_argument("output")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--binary", action="store_true")
+    p = sub.add_parser("matrix")
+    p.add_argument("rows", type=int)
+    p.add_argument("cols", type=int)
+    p.add_argument("nnz_per_row", type=int)
+    p.add_argument("output")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--binary", action="store_true")
+    p = sub.add_parser("replicate")
+    p.add_argument("base")
+    p.add_argument("factor", type=int)
+    p.add_argument("output")
+    p.add_argument("--binary", action="store_true")
+    args = parser.parse_args()
+
+    if args.kind == "rmat":
+        n = 1 << args.scale
+        write(args.output, n, n, args.edges, rmat(args.scale, args.edges, args.seed), args.binary)
+    elif args.kind == "matrix":
+        chunks = random_matrix(args.rows, args.cols, args.nnz_per_row, args.seed)
+        write(args.output, args.rows, args.cols, args.rows * args.nnz_per_row, chunks, args.binary)
+    else:
+        rows, cols, chunks = replicate(args.base, args.factor)
+        entries = coo_cache.read_header(coo_cache.cache_path(args.base))["entries"] * args.factor
+        write(args.output, rows, cols, entries, chunks, args.binary)
+    print ("Wrote " + (coo_cache.cache_path(args.output) if args.binary else args.output))
+
+if __name__ == "__main__":
+    main()
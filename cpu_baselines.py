@@ -0,0 +1,209 @@
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+import inputs
+import results
+import stats
+import sweep_spec
+
+# Builds and runs the OpenMP CPU baselines (<app>/baselines/cpu) on the inputs
+# of the DPU sweeps, and compares them with the DPU timings of the profile files.
+#
+# Each spec describes its baseline in a [cpu] table:
+#   run     = "./va -i {size} -t {threads}"  # {size}: total input size, {file}: input file
+#   make    = "make"                         # Build command, run in the baseline folder
+#   dir     = "SCAN-RSS/baselines/cpu"       # Baseline shared with another benchmark
+#   time    = "Execution time: ([0-9.]+)"    # Timer(s) to parse, summed if a list
+#   unit    = "ms"                           # or "s"
+#   threads = [4]                            # Thread counts, if the program fixes them
+#   default_size, default_file               # Input of DPU runs without -i / -f
+#   generate = "inputs"                      # {file} is written by inputs.py
+#
+# The total input size of a DPU run is given by sweep_spec.total_size.
+#
+# Usage: python3 cpu_baselines.py [app ...] [--sweep weak] [--threads 1,2,4] [--report]
+
+THREADS = [1, 2, 4, 8, 16, 32]
+RESULTS = "cpu_baselines.tsv"
+DEFAULT_TIME = r"Kernel(?: Time \(ms\):)? *([0-9.]+)"
+UNITS = {"ms" : 1.0, "s" : 1e3}
+DPU_PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+
+def baseline(spec, app_name):
+    cpu = dict(spec.get("cpu", {}))
+    if cpu:
+        cpu.setdefault("dir", os.path.join(app_name, "baselines", "cpu"))
+        cpu.setdefault("make", "make")
+        cpu.setdefault("time", DEFAULT_TIME)
+        cpu.setdefault("unit", "ms")
+    return cpu
+
+def dpu_input(rootdir, run, cpu):
+    # Input of a DPU run in the terms of its CPU baseline: total size, file, or None
+    args = run.cmd.split()
+    if "{file}" in cpu["run"] and "generate" not in cpu:
+        f = args[args.index("-f") + 1] if "-f" in args[:-1] else cpu.get("default_file")
+        if f is None or os.path.isabs(f):
+            return f
+        return os.path.join(rootdir, run.build.app, f)
+    if "{size}" not in cpu["run"] and "generate" not in cpu:
+        return None
+    size = sweep_spec.total_size(run, cpu.get("default_size", -1))
+    return size if size >= 0 else None
+
+def plan(rootdir, specs, sweep_names):
+    # Returns ({app: [inputs]}, {(sweep, app, dpus, tasklets, bl, size): input}) for the DPU runs
+    apps = {}
+    inputs_of = {}
+    for app_name, spec in specs.items():
+        cpu = baseline(spec, app_name)
+        if not cpu:
+            continue
+        for sweep_name in sweep_names:
+            for run in sweep_spec.expand(spec, sweep_name, rootdir, app_name, create=False):
+                value = dpu_input(rootdir, run, cpu)
+                info = results.parse_profile_name(run.profile)
+                inputs_of[(info[0], app_name) + info[1:] + (results.command_size(run.cmd),)] = value
+                apps.setdefault(app_name, [])
+                if value not in apps[app_name]:
+                    apps[app_name].append(value)
+    return apps, inputs_of
+
+def build(rootdir, app_name, cpu):
+    cwd = os.path.join(rootdir, cpu["dir"])
+    with open(os.path.join(cwd, "build.log"), "w") as log:
+        ret = subprocess.call(cpu["make"], shell=True, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+    print ("Built = " + app_name + " (" + cpu["dir"] + ")" + ("" if ret == 0 else " FAILED, see build.log"))
+    return ret
+
+def input_file(rootdir, app_name, cpu, value):
+    # Input file of the baseline: the DPU one, or generated once by inputs.py
+    if "generate" not in cpu:
+        return value
+    path = os.path.join(rootdir, cpu["dir"], "inputs", "input_" + str(value) + ".txt")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        print ("Generating " + path)
+        inputs.write(app_name, value, path)
+    return path
+
+def parse_time(cpu, text):
+    patterns = cpu["time"] if isinstance(cpu["time"], list) else [cpu["time"]]
+    total = 0.0
+    for p in patterns:
+        m = re.search(p, text, re.M)
+        if m is None:
+            return None
+        total += float(m.group(1))
+    return total * UNITS[cpu["unit"]]
+
+def run_one(rootdir, app_name, cpu, value, threads):
+    cmd = cpu["run"].format(size=value, file=input_file(rootdir, app_name, cpu, value), threads=threads)
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads))
+    print ("Running = " + app_name + " -> " + cmd + " (" + str(threads) + " threads)")
+    proc = subprocess.run(cmd, shell=True, cwd=os.path.join(rootdir, cpu["dir"]), env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, errors="replace")
+    with open(os.path.join(rootdir, app_name, "profile", "cpu_t" + str(threads)), "a") as prof:
+        prof.write(results.RUN_MARKER + cmd + "\n")
+        prof.write(proc.stdout)
+    return parse_time(cpu, proc.stdout)
+
+def run_all(rootdir, specs, apps, threads, reps, results_path):
+    with open(results_path, "a") as out:
+        for app_name, values in apps.items():
+            cpu = baseline(specs[app_name], app_name)
+            values = [v for v in values if v is not None] # DPU inputs not expressible for this baseline
+            if not values:
+                print ("Skipping " + app_name + ": its baseline runs none of the DPU inputs")
+                continue
+            os.makedirs(os.path.join(rootdir, app_name, "profile"), exist_ok=True)
+            if build(rootdir, app_name, cpu) != 0:
+                continue
+            for value in values:
+                for t in cpu.get("threads", threads):
+                    for r in range(reps):
+                        ms = run_one(rootdir, app_name, cpu, value, t)
+                        if ms is None:
+                            print ("  no timing found")
+                            continue
+                        out.write("\t".join([app_name, str(value), str(t), "%f" % ms]) + "\n")
+                        out.flush()
+
+def load_results(results_path):
+    # {(app, input): {threads: [ms]}}; inputs are compared as strings
+    cpu = {}
+    if not os.path.exists(results_path):
+        return cpu
+    with open(results_path) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 4:
+                continue
+            app_name, value, t, ms = fields
+            cpu.setdefault((app_name, value), {}).setdefault(int(t), []).append(float(ms))
+    return cpu
+
+def dpu_timings(rootdir, inputs_of):
+    # {(app, sweep, dpus, input): {(tasklets, bl): {phase: [ms]}}} from the profile files
+    out = {}
+    totals = {}
+    for prof in results.profile_files(rootdir):
+        for r in results.parse_file(prof):
+            key = (r.sweep, r.app, r.dpus, r.tasklets, r.bl, r.size)
+            if key not in inputs_of or inputs_of[key] is None:
+                continue
+            config = out.setdefault((r.app, r.sweep, r.dpus, str(inputs_of[key])), {}).setdefault((r.tasklets, r.bl), {})
+            config.setdefault(r.phase, []).append(r.ms)
+            if r.phase in DPU_PHASES:
+                run_key = (prof, r.run)
+                totals[run_key] = totals.get(run_key, 0.0) + r.ms
+                config.setdefault("runs", set()).add(run_key)
+    for configs in out.values():
+        for config in configs.values():
+            config["DPU total"] = [totals[k] for k in sorted(config.pop("runs", []))]
+    return out
+
+def report(rootdir, cpu, dpu, out=sys.stdout):
+    # One line per DPU configuration with a CPU baseline on the same input:
+    # fastest tasklets/bl on the DPU side, fastest thread count on the CPU side
+    out.write("app\tsweep\tdpus\tinput\tcpu_ms\tcpu_threads\thost_cpu_ms\tdpu_kernel_ms\tdpu_total_ms\tspeedup_kernel\tspeedup_total\n")
+    for (app_name, sweep_name, dpus, value), configs in sorted(dpu.items(), key=lambda kv: (kv[0][0], kv[0][1], kv[0][2], kv[0][3])):
+        if (app_name, value) not in cpu:
+            continue
+        t, cpu_ms = min(((t, stats.median(v)) for t, v in cpu[(app_name, value)].items()), key=lambda x: x[1])
+        best = [c for c in configs.values() if "DPU Kernel" in c]
+        if not best:
+            continue
+        best = min(best, key=lambda c: stats.median(c["DPU Kernel"]))
+        kernel = stats.median(best["DPU Kernel"])
+        total = stats.median(best["DPU total"]) if best["DPU total"] else float("nan")
+        host = stats.median(best["CPU"]) if "CPU" in best else float("nan")
+        out.write("%s\t%s\t%d\t%s\t%f\t%d\t%f\t%f\t%f\t%.3f\t%.3f\n" % (app_name, sweep_name, dpus, os.path.basename(value), cpu_ms, t, host, kernel, total,
+                  cpu_ms / kernel if kernel else float("nan"), cpu_ms / total if total else float("nan")))
+
+def main():
+    parser = argparse.ArgumentParser(usage="python3 cpu_baselines.py [app ...] [options]")
+    parser.add_argument("apps", nargs="*", help="benchmarks (default: all with a [cpu] table)")
+    parser.add_argument("--root", default=os.path.dirname(os.path.abspath(__file__)), help="path to the repo")
+    parser.add_argument("--sweep", action="append", default=None, choices=list(results.SWEEPS.values()), help="DPU sweeps whose inputs are used (default: all)")
+    parser.add_argument("--threads", default=",".join(map(str, THREADS)), help="OpenMP thread counts")
+    parser.add_argument("--reps", type=int, default=3, help="repetitions of each run")
+    parser.add_argument("--results", default=None, help="CPU timings, appended (default: cpu_baselines.tsv in the repo)")
+    parser.add_argument("--report", action="store_true", help="only print the speedup table from previous results")
+    args = parser.parse_args()
+
+    specs = sweep_spec.load_specs()
+    if args.apps:
+        specs = dict((k, v) for k, v in specs.items() if k in args.apps)
+    sweep_names = args.sweep or list(results.SWEEPS.values())
+    results_path = args.results or os.path.join(args.root, RESULTS)
+    apps, inputs_of = plan(args.root, specs, sweep_names)
+    if not args.report:
+        run_all(args.root, specs, apps, [int(t) for t in args.threads.split(",")], args.reps, results_path)
+    report(args.root, load_results(results_path), dpu_timings(args.root, inputs_of))
+
+if __name__ == "__main__":
+    main()
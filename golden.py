@@ -0,0 +1,124 @@
+import os
+import sys
+import struct
+
+import sweep_spec
+
+# Golden output cache of the host programs that support it (golden = true in
+# their spec: RED, SCAN-SSA, SCAN-RSS). The output of the CPU reference depends
+# only on the benchmark, its data type, the total input size and the seed of
+# its input (the host programs call srand(0)), so it is computed once:
+#   .golden/<app>/<TYPE>_n<size>_s<seed>.bin
+# holds a 64-byte header (element size and count, seed, hash of the elements)
+# followed by the raw output elements, and is memory-mapped by the host
+# programs (support/golden.h) and by load() below.
+#
+# The sweep passes -g <file> to these benchmarks. With --verify full (the
+# default) a run recomputes the CPU reference as before and writes the golden
+# output if it is missing. With --verify hash or --verify sample, the runs skip
+# the CPU reference (and its 'CPU' timer) and compare the DPU output with the
+# hash of the golden output, or with the last and 4095 random elements of it.
+# A run without its golden output falls back to a full check.
+#
+# Usage: python3 golden.py list [DIR]
+#        python3 golden.py check FILE...
+
+MAGIC = b"PRIMGLD1"
+HEADER = struct.Struct("<8s2I3Q24x") # Must match struct GoldenHeader
+MODES = {"full" : 0, "hash" : 1, "sample" : 2}
+SEED = 0
+DEFAULT_TYPE = "INT64" # TYPE of the Makefiles
+BLOCK = 1 << 22 # Words hashed at once
+MASK = (1 << 64) - 1
+
+def path(golden_dir, run):
+    # Golden output of a run, None if its input size is unknown
+    size = sweep_spec.total_size(run)
+    if size < 0:
+        return None
+    data_type = dict(run.build.macros).get("TYPE", DEFAULT_TYPE)
+    return os.path.join(golden_dir, run.build.app, "%s_n%d_s%d.bin" % (data_type, size, SEED))
+
+def command(verify, run):
+    # Command line of a run with the golden output options of 'verify' (sweep.Verify)
+    if verify is None or run.build.app not in verify.apps:
+        return run.cmd
+    golden_path = path(verify.golden_dir, run)
+    if golden_path is None:
+        return run.cmd
+    os.makedirs(os.path.dirname(golden_path), exist_ok=True)
+    return run.cmd + " -g " + golden_path + " -c " + str(MODES[verify.mode])
+
+def read_header(golden_path):
+    with open(golden_path, "rb") as f:
+        magic, elem_size, _, elems, seed, digest = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(golden_path + " is not a golden output file")
+    return {"elem_size" : elem_size, "elems" : elems, "seed" : seed, "hash" : digest}
+
+def load(golden_path):
+    # Returns (header, elements) where elements is a read-only memmap of unsigned integers of the element size
+    import numpy as np
+    header = read_header(golden_path)
+    elements = np.memmap(golden_path, dtype="<u%d" % header["elem_size"], mode="r", offset=HEADER.size, shape=(header["elems"],))
+    return header, elements
+
+def digest(golden_path, header):
+    # goldenHash() of support/golden.h: sum of the 64-bit words times 2i+1, then mixed with the size
+    import numpy as np
+    nbytes = header["elems"] * header["elem_size"]
+    h = np.uint64(0)
+    with open(golden_path, "rb") as f:
+        f.seek(HEADER.size)
+        i = 0
+        while True:
+            data = f.read(8 * BLOCK)
+            if not data:
+                break
+            if len(data) % 8:
+                data += b"\0" * (8 - len(data) % 8)
+            words = np.frombuffer(data, dtype="<u8")
+            weights = np.arange(i, i + len(words), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+            with np.errstate(over="ignore"):
+                h += (words * weights).sum(dtype=np.uint64)
+            i += len(words)
+    h = int(h) ^ nbytes
+    h = ((h ^ (h >> 30)) * 0xbf58476d1ce4e5b9) & MASK
+    h = ((h ^ (h >> 27)) * 0x94d049bb133111eb) & MASK
+    return h ^ (h >> 31)
+
+def check(golden_path):
+    # Returns None if the golden output is valid, the reason why it is not otherwise
+    try:
+        header = read_header(golden_path)
+    except (OSError, ValueError, struct.error) as e:
+        return str(e)
+    if os.path.getsize(golden_path) != HEADER.size + header["elems"] * header["elem_size"]:
+        return "truncated"
+    if digest(golden_path, header) != header["hash"]:
+        return "corrupt (hash mismatch)"
+    return None
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ["list", "check"] or (sys.argv[1] == "check" and len(sys.argv) < 3):
+        print ("Usage: python3 golden.py list [DIR] | check FILE...")
+        return 1
+    if sys.argv[1] == "list":
+        golden_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(os.path.abspath(__file__)), ".golden")
+        if not os.path.isdir(golden_dir):
+            return 0
+        for app_name in sorted(os.listdir(golden_dir)):
+            for name in sorted(os.listdir(os.path.join(golden_dir, app_name))):
+                if name.endswith(".bin"):
+                    header = read_header(os.path.join(golden_dir, app_name, name))
+                    print ("%s\t%s\t%d elements of %d bytes\t%016x" % (app_name, name, header["elems"], header["elem_size"], header["hash"]))
+        return 0
+    failed = 0
+    for golden_path in sys.argv[2:]:
+        reason = check(golden_path)
+        print (golden_path + ": " + ("ok" if reason is None else reason))
+        failed += reason is not None
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import argparse
+
+import numpy as np
+
+# Vectorized input generators for TS, BS, VA, SEL, UNI, RED and SCAN.
+#
+# Inputs are produced in NumPy chunks from a fixed seed, so the same
+# (app, size, seed) always gives the same file, whatever the chunk size.
+# Files are written either as text, one value per line (the format of
+# TS/baselines/gpu/randlist.py), or as raw little-endian binary that can be
+# memory-mapped (np.memmap) or read with a single fread().
+#
+# Usage: python3 inputs.py APP NR_ELEMENTS OUTPUT [--seed S] [--binary]
+#   Benchmarks with two inputs (VA: A, B; BS: input, querys) write OUTPUT.<name>
+
+CHUNK = 1 << 22
+RAND_MAX = 2**31 - 1 # glibc rand()
+
+def chunk_rng(seed, index):
+    # One generator per chunk: reproducible and independent of how chunks are consumed
+    return np.random.default_rng([seed, index])
+
+def chunks(n, chunk=CHUNK):
+    for start in range(0, n, chunk):
+        yield start, min(start + chunk, n)
+
+def random_floats(n, seed=0):
+    # TS: random values between 0 and 10 with 8 decimals, like randlist.py
+    for i, (lo, hi) in enumerate(chunks(n)):
+        yield chunk_rng(seed, i).integers(0, 1000000000, hi - lo, endpoint=True) / 100000000.0
+
+def random_ints(n, dtype, seed=0):
+    # VA, RED, SCAN: (T) rand()
+    for i, (lo, hi) in enumerate(chunks(n)):
+        yield chunk_rng(seed, i).integers(0, RAND_MAX, hi - lo, endpoint=True).astype(dtype)
+
+def sequence(n, dtype, first=0):
+    for lo, hi in chunks(n):
+        yield np.arange(lo + first, hi + first, dtype=dtype)
+
+def unique_pairs(n, dtype):
+    # UNI: A[i] = i%2==0 ? i : i+1
+    for lo, hi in chunks(n):
+        a = np.arange(lo, hi, dtype=dtype)
+        a[(a % 2) == 1] += 1
+        yield a
+
+def random_querys(n, max_value, dtype, seed=0):
+    # BS/baselines/gpu/run.py: np.random.randint(1, arr_len, num_querys)
+    for i, (lo, hi) in enumerate(chunks(n)):
+        yield chunk_rng(seed, i).integers(1, max_value, hi - lo).astype(dtype)
+
+def generate(app, n, seed=0, querys=None):
+    # Returns {name: (chunk iterator, text format)} for one benchmark input set
+    if app == "TS":
+        return {"" : (random_floats(n, seed), "%.9g")}
+    if app == "BS":
+        nq = n if querys is None else querys
+        return {"input" : (sequence(n, np.int64, 1), "%d"),
+                "querys" : (random_querys(nq, n, np.int64, seed), "%d")}
+    if app == "VA":
+        return {"A" : (random_ints(n, np.int32, seed), "%d"),
+                "B" : (random_ints(n, np.int32, seed + 1), "%d")}
+    if app == "SEL":
+        return {"" : (sequence(n, np.uint64, 1), "%d")}
+    if app == "UNI":
+        return {"" : (unique_pairs(n, np.int64), "%d")}
+    if app in ["RED", "SCAN-SSA", "SCAN-RSS"]:
+        return {"" : (random_ints(n, np.int64, seed), "%d")}
+    raise ValueError("No input generator for " + app)
+
+def write_text(path, it, fmt):
+    line = fmt + "\n"
+    with open(path, "w") as f:
+        for c in it:
+            f.write(line * len(c) % tuple(c.tolist()))
+
+def write_binary(path, it):
+    with open(path, "wb") as f:
+        for c in it:
+            c.astype(c.dtype.newbyteorder("<"), copy=False).tofile(f)
+
+def load_binary(path, dtype):
+    return np.memmap(path, dtype=np.dtype(dtype).newbyteorder("<"), mode="r")
+
+def write(app, n, output, seed=0, binary=False, querys=None):
+    paths = []
+    for name, (it, fmt) in generate(app, n, seed, querys).items():
+        path = output + "." + name if name else output
+        if binary:
+            write_binary(path, it)
+        else:
+            write_text(path, it, fmt)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(usage="python3 inputs.py APP NR_ELEMENTS OUTPUT [options]")
+    parser.add_argument("app", choices=["TS", "BS", "VA", "SEL", "UNI", "RED", "SCAN-SSA", "SCAN-RSS"])
+    parser.add_argument("n", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--binary", action="store_true", help="raw little-endian binary instead of text")
+    parser.add_argument("--querys", type=int, default=None, help="BS: number of queries (default: NR_ELEMENTS)")
+    args = parser.parse_args()
+
+    for path in write(args.app, args.n, args.output, args.seed, args.binary, args.querys):
+        print ("Wrote " + path + " (" + str(os.path.getsize(path)) + " bytes)")
+
+if __name__ == "__main__":
+    main()
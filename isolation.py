@@ -0,0 +1,93 @@
+import os
+import re
+import time
+import signal
+import subprocess
+from collections import namedtuple
+
+# Managed subprocesses for the builds and runs of the sweeps. Each command
+# runs in its own process group with an optional deadline: past it the group
+# gets SIGTERM, then SIGKILL after GRACE seconds. The process is reaped with
+# os.wait4 to capture its resource usage, and its outcome is classified:
+#   ok           exit code 0 (and no verification error in the output of a run)
+#   build-fail   make failed
+#   verify-fail  the host program reported that the DPU results are wrong (exit
+#                code 0 or not)
+#   timeout      killed at its deadline
+#   crash        non-zero exit code or killed by a signal
+
+OK = "ok"
+BUILD_FAIL = "build-fail"
+VERIFY_FAIL = "verify-fail"
+TIMEOUT = "timeout"
+CRASH = "crash"
+
+# "[ERROR] Outputs differ!" of most host programs, "ERROR: Mismatch at ..." of BFS and SpMV
+VERIFY_RE = re.compile(r"(Outputs|results) differ|Mismatch at ", re.I)
+GRACE = 5.0
+
+# wall and cpu (user + system) in seconds, max_rss in KB
+Outcome = namedtuple("Outcome", ["status", "returncode", "wall", "cpu", "max_rss"])
+
+class Process:
+
+    def __init__(self, cmd, cwd, out, timeout=None, shell=True):
+        self.start = time.time()
+        self.deadline = None if timeout is None else self.start + timeout
+        self.killed = None
+        self.outcome = None
+        self.proc = subprocess.Popen(cmd, shell=shell, cwd=cwd, stdout=out, stderr=subprocess.STDOUT, start_new_session=True)
+
+    def poll(self):
+        # Outcome once the process exited, None while it runs
+        if self.outcome is not None:
+            return self.outcome
+        pid, status, usage = os.wait4(self.proc.pid, os.WNOHANG)
+        now = time.time()
+        if pid == 0:
+            if self.deadline is not None and now > self.deadline:
+                self.kill(now)
+            return None
+        code = os.waitstatus_to_exitcode(status)
+        self.proc.returncode = code # Already reaped, Popen must not wait for it
+        if self.killed is not None:
+            result = TIMEOUT
+        else:
+            result = OK if code == 0 else CRASH
+        self.outcome = Outcome(result, code, now - self.start, usage.ru_utime + usage.ru_stime, usage.ru_maxrss)
+        return self.outcome
+
+    def kill(self, now):
+        # SIGTERM to the whole group (shell and its children), SIGKILL if it lingers
+        if self.killed is None:
+            self.killed = now
+            sig = signal.SIGTERM
+        elif now - self.killed > GRACE:
+            sig = signal.SIGKILL
+        else:
+            return
+        try:
+            os.killpg(self.proc.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def wait(self, interval=0.05):
+        while self.poll() is None:
+            time.sleep(interval)
+        return self.outcome
+
+def call(cmd, cwd, out, timeout=None, shell=True):
+    return Process(cmd, cwd, out, timeout, shell).wait()
+
+def classify_run(outcome, text):
+    if outcome.status in (OK, CRASH) and VERIFY_RE.search(text): # Some exit with -1 after the error
+        return outcome._replace(status=VERIFY_FAIL)
+    return outcome
+
+def classify_build(outcome):
+    if outcome.status == CRASH:
+        return outcome._replace(status=BUILD_FAIL)
+    return outcome
+
+def describe(outcome):
+    return "%s (exit %d, wall %.1f s, cpu %.1f s, max RSS %d KB)" % (outcome.status, outcome.returncode, outcome.wall, outcome.cpu, outcome.max_rss)
@@ -0,0 +1,47 @@
+import os
+import json
+import time
+
+# Append-only journal of completed runs, so that an interrupted sweep can be
+# restarted without repeating finished work. One JSON line per run, flushed
+# and fsync'ed before the next run is recorded. A fresh sweep appends a
+# marker that forgets the runs completed before it, but their timings are
+# kept for the run time estimates.
+
+def run_key(run):
+    return json.dumps([run.build.app, [list(m) for m in run.build.macros], run.cmd, run.profile])
+
+def load(path):
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # Last line cut short by a crash
+            if "fresh" in entry:
+                done.clear()
+            elif entry.get("status", "ok") == "ok":
+                done.add(json.dumps(entry["run"])) # Failed runs are run again
+    return done
+
+def open_journal(path, fresh=False):
+    journal = open(path, "a+")
+    if journal.tell() > 0:
+        journal.seek(journal.tell() - 1)
+        if journal.read(1) != "\n":
+            journal.write("\n") # Do not glue new entries to a line cut short by a crash
+    if fresh:
+        journal.write(json.dumps({"fresh" : time.time()}) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+    return journal
+
+def record(journal, run, **info):
+    entry = dict(info)
+    entry["run"] = json.loads(run_key(run))
+    journal.write(json.dumps(entry) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
@@ -0,0 +1,172 @@
+import os
+import re
+import sys
+import json
+import argparse
+import itertools
+
+try:
+    import tomllib
+except ImportError: # Python < 3.11
+    import tomli as tomllib
+
+import results
+import sweep
+
+# Microbenchmarks runner, in place of the Microbenchmarks/*/run.sh loops.
+#
+# Each microbenchmark is described in specs/microbenchmarks/<name>.toml:
+#   make     = "NR_DPUS=1 NR_TASKLETS={tasklets} BL=10 OP={op} make all"
+#   run      = "./bin/host_code -w 0 -e 1 -i {size}"
+#   profile  = "{op}_tl{tasklets}.txt"      # Same names as the run.sh scripts
+#   metrics  = { "MB/s" = "size * 8 * freq / cycles" }
+#   op       = ["ADD", "SUB"]               # Lists are axes, scalars are constants
+#   [[variants]]                            # Optional groups of axes and constants
+# Variants are run through the sweep engine: every distinct build is compiled
+# once, concurrently, into Microbenchmarks/<name>/build/<tag>, runs share the
+# DPU ranks, and the output of every run is appended to its profile file.
+#
+# The profile files are then parsed into microbench.jsonl, one JSON object per
+# run with the axes, the DPU cycles, the timers, and the metrics evaluated with
+# freq (DPU frequency in MHz), cycles, cpu_ms, cpu_dpu_ms, kernel_ms,
+# dpu_cpu_ms, cpu_dpu_gbs and dpu_cpu_gbs.
+#
+# Usage: python3 microbench.py [name ...] [-j JOBS] [-r RANKS] [--only KEY=V1,V2] [--dry-run]
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "specs", "microbenchmarks")
+RESERVED = ["make", "run", "profile", "metrics", "variants"]
+FREQ = 350 # MHz
+CYCLES_RE = re.compile(r"DPU cycles\s*=\s*([-+]?[0-9.]+(?:e[-+]?\d+)?) cc", re.I)
+BANDWIDTH_RE = re.compile(r"(CPU-DPU|DPU-CPU) Bandwidth \(GB/s\): *([-+]?(?:nan|inf|[0-9.]+(?:e[-+]?\d+)?))", re.I)
+TIMERS = {"CPU" : "cpu_ms", "CPU-DPU" : "cpu_dpu_ms", "DPU Kernel" : "kernel_ms", "DPU-CPU" : "dpu_cpu_ms"}
+
+def load_specs(spec_dir=SPEC_DIR):
+    specs = {}
+    for name in sorted(os.listdir(spec_dir)):
+        if name.endswith(".toml"):
+            with open(os.path.join(spec_dir, name), "rb") as f:
+                specs[name[:-len(".toml")]] = tomllib.load(f)
+    return specs
+
+def variants(spec):
+    # Yields the values of every variant: constants and one value of each axis
+    common = dict((k, v) for k, v in spec.items() if k not in RESERVED)
+    for group in spec.get("variants", [{}]):
+        merged = dict(common)
+        merged.update(group)
+        keys = sorted(merged)
+        axes = [merged[k] if isinstance(merged[k], list) else [merged[k]] for k in keys]
+        for combination in itertools.product(*axes):
+            yield dict(zip(keys, combination))
+
+def expand(spec, name):
+    # Returns [(sweep.Run, values)] of one microbenchmark
+    app = os.path.join("Microbenchmarks", name)
+    runs = []
+    for values in variants(spec):
+        build = sweep.Build(app, sweep.parse_make(spec["make"].format(**values)))
+        run = sweep.Run(build, spec["run"].format(**values), values.get("dpus", 1), spec["profile"].format(**values))
+        runs.append((run, values))
+    return runs
+
+def filter_runs(runs, conditions):
+    for cond in conditions:
+        key, accepted = cond.split("=", 1)
+        accepted = accepted.split(",")
+        runs = [(r, v) for r, v in runs if str(v.get(key)) in accepted]
+    return runs
+
+def parse_block(text):
+    # Cycles, timers and bandwidths printed by one run
+    parsed = {}
+    m = CYCLES_RE.search(text)
+    if m is not None:
+        parsed["cycles"] = float(m.group(1))
+    for r in results.parse_lines(text.splitlines(), None, None, 0, 0, 0):
+        if r.phase in TIMERS:
+            parsed[TIMERS[r.phase]] = r.ms
+    for m in BANDWIDTH_RE.finditer(text):
+        parsed[m.group(1).lower().replace("-", "_") + "_gbs"] = float(m.group(2))
+    return parsed
+
+def evaluate(metrics, values):
+    out = {}
+    for metric, formula in metrics.items():
+        try:
+            out[metric] = eval(formula, {"__builtins__" : {}}, dict(values))
+        except (NameError, ZeroDivisionError):
+            pass # Timer or counter missing from the output
+    return out
+
+def collect(rootdir, specs, runs, freq=FREQ):
+    # One record per run found in the profile files
+    records = []
+    for run, values in runs:
+        name = os.path.basename(run.build.app)
+        path = os.path.join(rootdir, run.build.app, "profile", run.profile)
+        for i, (_, text) in enumerate(results.run_blocks(path, run.cmd)):
+            parsed = parse_block(text)
+            if not parsed:
+                continue
+            env = dict(values, freq=freq, **parsed)
+            records.append({"bench" : name, "params" : values, "run" : i, "measured" : parsed,
+                            "metrics" : evaluate(specs[name].get("metrics", {}), env)})
+    return records
+
+def save(path, records):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        for r in records:
+            f.write(json.dumps(r, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    rootdir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(usage="python3 microbench.py [name ...] [options]")
+    parser.add_argument("names", nargs="*", help="microbenchmarks (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel builds")
+    parser.add_argument("-r", "--ranks", type=int, default=None, help="DPU ranks shared by concurrent runs (default: one run at a time)")
+    parser.add_argument("--cache", default=os.path.join(rootdir, ".build_cache"), help="build cache folder")
+    parser.add_argument("--cache-size", type=float, default=10, help="build cache size limit in GB")
+    parser.add_argument("--no-cache", action="store_true", help="always rebuild")
+    parser.add_argument("--journal", default=os.path.join(rootdir, ".microbench.journal"), help="journal of completed runs")
+    parser.add_argument("--fresh", action="store_true", help="run again the variants already in the journal")
+    parser.add_argument("--only", action="append", default=[], metavar="KEY=V1,V2", help="keep variants whose KEY is one of the values")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan, do not build or run")
+    parser.add_argument("--parse", action="store_true", help="only parse the profile files")
+    parser.add_argument("--freq", type=float, default=FREQ, help="DPU frequency in MHz, for the metrics")
+    parser.add_argument("--output", default=os.path.join(rootdir, "microbench.jsonl"), help="parsed results")
+    args = parser.parse_args()
+
+    specs = load_specs()
+    names = args.names or list(specs.keys())
+    for name in names:
+        if name not in specs:
+            print ("Microbenchmark " + name + " not available: " + ", ".join(specs.keys()))
+            return 1
+    runs = []
+    for name in names:
+        runs += expand(specs[name], name)
+    runs = filter_runs(runs, args.only)
+
+    if args.dry_run:
+        for run, values in runs:
+            print (run.build.app + "\t" + sweep.build_tag(run.build) + "\t" + run.cmd + "\t" + run.profile)
+        print (str(len(runs)) + " run(s), " + str(len(set(r.build for r, _ in runs))) + " build(s)")
+        return 0
+
+    if not args.parse:
+        cache_dir = None if args.no_cache else args.cache
+        monitor = {"metrics_path" : None, "dashboard" : False}
+        sweep.run_sweep(rootdir, [r for r, _ in runs], args.jobs, args.ranks, cache_dir, int(args.cache_size * 2**30), None, args.journal, args.fresh, monitor)
+    records = collect(rootdir, specs, runs, args.freq)
+    save(args.output, records)
+    print ("Parsed " + str(len(records)) + " run(s) into " + args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
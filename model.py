@@ -0,0 +1,227 @@
+import os
+import sys
+import math
+import json
+import argparse
+
+import numpy as np
+
+import microbench
+import results
+import stats
+import sweep_spec
+
+# Roofline and transfer-cost model of the DPUs, fitted from the microbenchmark
+# results (microbench.jsonl, written by microbench.py):
+#   compute ceilings  MOPS per (op, type, tasklets), Arithmetic-Throughput and
+#                     the compute-bound end of Operational-Intensity
+#   MRAM bandwidth    MB/s per tasklets, STREAM with MEM=MRAM
+#   transfers         latency + bytes / bandwidth per (transfer, direction, dpus),
+#                     CPU-DPU
+#
+# Each spec describes the work of its runs in a [model] table, as formulas of
+# size (total input size, see sweep_spec.total_size), dpus, tasklets, bl and
+# the numeric options of the run command (e.g. m and n for "-m 8192 -n 1024"):
+#   type       = "INT32"          # Data type and operation of the compute ceiling
+#   op         = "ADD"
+#   ops        = "size"           # Operations, all DPUs
+#   mram       = "12 * size"      # MRAM bytes read and written, all DPUs
+#   input      = "8 * size"       # Bytes split across the DPUs, CPU-DPU
+#   replicated = "4 * n"          # Bytes copied to every DPU, CPU-DPU
+#   output     = "4 * size"       # Bytes gathered from the DPUs, DPU-CPU
+#   transfer   = "PUSH"           # CPU-DPU microbenchmark variant of the transfers
+#   default_size                  # Input size of runs without -i / -n / -m / -p
+#
+# The DPU Kernel time is the roofline max(ops / compute, mram / bandwidth) of
+# one DPU. Transfers to more DPUs than measured (one rank) are assumed to run
+# in parallel over the ranks.
+#
+# Usage: python3 model.py [app ...] [--sweep weak] [--dpus 256,512] [--outliers]
+
+MICROBENCH = "microbench.jsonl"
+TRANSFER = "PUSH"
+PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+OUTLIER = 2.0 # Measured vs. predicted ratio (either way) flagged as an outlier
+MIN_P = 8 # Operational-Intensity points with p >= MIN_P operations per element are compute-bound
+DIRECTIONS = {"cpu_dpu_ms" : "CPU-DPU", "dpu_cpu_ms" : "DPU-CPU"}
+RANK = 64
+
+def fit(records):
+    # Returns the model parameters from microbench records, as JSON-friendly dicts
+    compute = {}
+    mram = {}
+    samples = {}
+    for r in records:
+        params, metrics, measured = r["params"], r["metrics"], r["measured"]
+        if r["bench"] == "Arithmetic-Throughput" or (r["bench"] == "Operational-Intensity" and params["p"] >= MIN_P):
+            if math.isfinite(metrics.get("MOPS", float("nan"))):
+                table = compute.setdefault(params["op"] + "/" + params["type"], {})
+                t = str(params["tasklets"])
+                table[t] = max(table.get(t, 0.0), metrics["MOPS"])
+        elif r["bench"] == "STREAM" and params["mem"] == "MRAM":
+            if math.isfinite(metrics.get("MB/s", float("nan"))):
+                t = str(params["tasklets"])
+                mram[t] = max(mram.get(t, 0.0), metrics["MB/s"])
+        elif r["bench"] == "CPU-DPU":
+            for field, direction in DIRECTIONS.items():
+                ms = measured.get(field, float("nan"))
+                if math.isfinite(ms) and ms > 0:
+                    key = (params["transfer"], direction, params["dpus"])
+                    samples.setdefault(key, []).append((params["size"] * 8, ms))
+
+    transfer = {}
+    for (kind, direction, dpus), points in samples.items():
+        nbytes = np.array([p[0] for p in points], dtype=np.float64)
+        ms = np.array([p[1] for p in points], dtype=np.float64)
+        if len(np.unique(nbytes)) < 2:
+            continue
+        # Weighted by 1/ms, so that small transfers fit in relative terms
+        slope, latency = np.polyfit(nbytes, ms, 1, w=1.0 / ms)
+        transfer.setdefault(kind + "/" + direction, {})[str(dpus)] = [max(latency, 0.0), max(slope, 0.0)]
+    return {"compute" : compute, "mram" : mram, "transfer" : transfer}
+
+def interpolate(table, x):
+    # Linear interpolation in a {str(x): y} table, clamped at both ends
+    xs = sorted(table, key=float)
+    return float(np.interp(x, [float(k) for k in xs], [table[k] for k in xs]))
+
+def compute_ceiling(model, op, dtype, tasklets):
+    # MOPS of one DPU, falling back to ADD, then to any measured operation of the type
+    for key in [op + "/" + dtype, "ADD/" + dtype] + sorted(k for k in model["compute"] if k.endswith("/" + dtype)):
+        if key in model["compute"]:
+            return interpolate(model["compute"][key], tasklets)
+    return None
+
+def transfer_ms(model, kind, direction, dpus, nbytes_per_dpu):
+    table = model["transfer"].get(kind + "/" + direction)
+    if not table or nbytes_per_dpu <= 0:
+        return 0.0 if nbytes_per_dpu <= 0 else None
+    measured = sorted(int(d) for d in table)
+    if dpus > measured[-1]:
+        near = measured[-1] # Ranks in parallel
+    else:
+        near = min(d for d in measured if d >= dpus)
+    latency, slope = table[str(near)]
+    return latency + slope * nbytes_per_dpu
+
+def workload(spec, run):
+    # {ops, mram, input, replicated, output} of a run, None if it cannot be modeled
+    m = spec.get("model")
+    if not m:
+        return None
+    values = results.command_flags(run.cmd)
+    f = sweep_spec.run_fields(run)
+    values.update(dpus=f["dpus"], tasklets=f["tasklets"], bl=f["bl"])
+    size = sweep_spec.total_size(run, m.get("default_size", -1))
+    if size >= 0:
+        values["size"] = size
+    work = {}
+    for k in ["ops", "mram", "input", "replicated", "output"]:
+        rule = m.get(k, 0)
+        try:
+            work[k] = float(eval(rule, {"__builtins__" : {}}, dict(values)) if isinstance(rule, str) else rule)
+        except NameError:
+            return None # Unknown input size
+    return work
+
+def predict(model, spec, run):
+    # Returns ({phase: ms}, bound) for a run, or (None, None) if it cannot be modeled
+    work = workload(spec, run)
+    if work is None:
+        return None, None
+    m = spec["model"]
+    f = sweep_spec.run_fields(run)
+    dpus = f["dpus"]
+    mops = compute_ceiling(model, m.get("op", "ADD"), m["type"], f["tasklets"])
+    if mops is None or not model["mram"]:
+        return None, None
+    compute = work["ops"] / dpus / (mops * 1e6) * 1e3
+    memory = work["mram"] / dpus / (interpolate(model["mram"], f["tasklets"]) * 1e6) * 1e3
+    kind = m.get("transfer", TRANSFER)
+    to_dpu = transfer_ms(model, kind, "CPU-DPU", dpus, work["input"] / dpus)
+    replicated = transfer_ms(model, kind, "CPU-DPU", dpus, work["replicated"])
+    from_dpu = transfer_ms(model, kind, "DPU-CPU", dpus, work["output"] / dpus)
+    if to_dpu is None or replicated is None or from_dpu is None:
+        return None, None
+    ms = {"CPU-DPU" : to_dpu + replicated, "DPU Kernel" : max(compute, memory), "DPU-CPU" : from_dpu}
+    return ms, "compute" if compute >= memory else "memory"
+
+def measured_timings(rootdir):
+    # {(sweep, app, dpus, tasklets, bl, size): {phase: [ms]}} from the profile files
+    out = {}
+    for prof in results.profile_files(rootdir):
+        for r in results.parse_file(prof):
+            if r.phase in PHASES:
+                out.setdefault((r.sweep, r.app, r.dpus, r.tasklets, r.bl, r.size), {}).setdefault(r.phase, []).append(r.ms)
+    return out
+
+def report(rootdir, model, specs, sweep_names, dpus=None, threshold=OUTLIER, outliers_only=False, out=sys.stdout):
+    # One line per run and phase: prediction, measured median and ratio.
+    # Returns the number of outliers.
+    measured = measured_timings(rootdir)
+    flagged = 0
+    out.write("app\tsweep\tdpus\ttasklets\tbl\tphase\tbound\tpredicted_ms\tmeasured_ms\tratio\tflag\n")
+    for app_name, spec in specs.items():
+        if "model" not in spec:
+            continue
+        for sweep_name in sweep_names:
+            if dpus is not None:
+                spec = dict(spec)
+                spec[sweep_name] = dict(spec.get(sweep_name, {}), dpus=dpus)
+            for run in sweep_spec.expand(spec, sweep_name, rootdir, app_name, create=False):
+                ms, bound = predict(model, spec, run)
+                if ms is None:
+                    continue
+                f = sweep_spec.run_fields(run)
+                key = (sweep_name, app_name, f["dpus"], f["tasklets"], f["bl"], results.command_size(run.cmd))
+                for phase in PHASES:
+                    values = measured.get(key, {}).get(phase)
+                    m = stats.median(values) if values else float("nan")
+                    ratio = m / ms[phase] if ms[phase] > 0 else float("nan")
+                    flag = "OUTLIER" if ratio > threshold or ratio < 1.0 / threshold else ""
+                    flagged += flag != ""
+                    if outliers_only and not flag:
+                        continue
+                    out.write("%s\t%s\t%d\t%d\t%d\t%s\t%s\t%f\t%f\t%.3f\t%s\n" % (app_name, sweep_name, f["dpus"], f["tasklets"], f["bl"], phase,
+                              bound if phase == "DPU Kernel" else "", ms[phase], m, ratio, flag))
+    return flagged
+
+def save(path, model):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(model, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    rootdir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(usage="python3 model.py [app ...] [options]")
+    parser.add_argument("apps", nargs="*", help="benchmarks (default: all with a [model] table)")
+    parser.add_argument("--root", default=rootdir, help="path to the repo")
+    parser.add_argument("--sweep", action="append", default=None, choices=list(results.SWEEPS.values()), help="sweeps to predict (default: all)")
+    parser.add_argument("--dpus", default=None, help="predict for these DPU counts instead of those of the sweeps")
+    parser.add_argument("--microbench", default=os.path.join(rootdir, MICROBENCH), help="microbenchmark results to fit")
+    parser.add_argument("--save", default=None, help="write the fitted model (JSON)")
+    parser.add_argument("--model", default=None, help="use a model saved with --save instead of fitting")
+    parser.add_argument("--threshold", type=float, default=OUTLIER, help="measured/predicted ratio flagged as an outlier")
+    parser.add_argument("--outliers", action="store_true", help="only print the outliers, exit with 1 if there are any")
+    args = parser.parse_args()
+
+    if args.model:
+        model = load(args.model)
+    else:
+        model = fit(microbench.load(args.microbench))
+    if args.save:
+        save(args.save, model)
+    specs = sweep_spec.load_specs()
+    if args.apps:
+        specs = dict((k, v) for k, v in specs.items() if k in args.apps)
+    dpus = [int(d) for d in args.dpus.split(",")] if args.dpus else None
+    flagged = report(args.root, model, specs, args.sweep or list(results.SWEEPS.values()), dpus, args.threshold, args.outliers)
+    return 1 if args.outliers and flagged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import math
+from collections import deque
+
+import results
+import stats
+
+# Live instrumentation of a sweep: completed and remaining runs, ETA from the
+# observed durations of each configuration, histograms of the CPU-DPU /
+# DPU Kernel / DPU-CPU times, and alerts when a run is slower than the
+# previous result of the same configuration in its profile file.
+#
+# The state is redrawn in the terminal (--dashboard), with histograms of the
+# last WINDOW samples, and exported in the Prometheus text format to a metrics
+# file that other tools can scrape, with histograms of all the samples since
+# the start of the sweep (Prometheus histograms never decrease).
+
+PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+WINDOW = 256 # Samples kept per phase for the rolling histograms of the dashboard
+BUCKETS = [2.0 ** k for k in range(-6, 18)] # Upper bounds in ms, 1/64 ms to ~131 s
+REFRESH = 1.0
+EVENTS = 8
+
+def timings(text, app=None):
+    t = {}
+    for r in results.parse_lines(text.splitlines(), None, app, 0, 0, 0):
+        if r.phase in PHASES:
+            t[r.phase] = r.ms
+    return t
+
+def last_result(profile_path, cmd, app=None):
+    # Timings of the last run of 'cmd' in a profile file, {} if there is none
+    last = None
+    for _, text in results.run_blocks(profile_path, cmd):
+        last = text
+    return timings(last, app) if last is not None else {}
+
+def bucket(v):
+    i = 0
+    while i < len(BUCKETS) and v > BUCKETS[i]:
+        i += 1
+    return i
+
+def histogram(values):
+    counts = [0] * (len(BUCKETS) + 1)
+    for v in values:
+        counts[bucket(v)] += 1
+    return counts
+
+def format_seconds(s):
+    if s is None or math.isinf(s):
+        return "?"
+    s = int(s)
+    return "%d:%02d:%02d" % (s // 3600, s % 3600 // 60, s % 60)
+
+class Progress:
+
+    def __init__(self, runs, metrics_path=None, dashboard=False, alert=0.2, past=None):
+        # past: durations of earlier sweeps, {(app, dpus, tasklets): [seconds]} from sweep_spec.history
+        self.total = len(runs)
+        self.done = 0
+        self.failed = 0
+        self.running = 0
+        self.regressions = 0
+        self.outcomes = {}
+        self.metrics_path = metrics_path
+        self.dashboard = dashboard
+        self.alert = alert
+        self.start = time.time()
+        self.busy = 0.0
+        self.durations = {}
+        self.past = past or {}
+        self.samples = dict((p, deque(maxlen=WINDOW)) for p in PHASES)
+        self.counts = dict((p, [0] * (len(BUCKETS) + 1)) for p in PHASES) # All samples, for the metrics file
+        self.sums = dict((p, 0.0) for p in PHASES)
+        self.pending_keys = [self.key(r) for r in runs]
+        self.events = deque(maxlen=EVENTS)
+        self.last_refresh = 0.0
+        self.baseline = {}
+
+    def key(self, run):
+        info = results.parse_profile_name(run.profile)
+        return (run.build.app, run.nr_dpus, info[2] if info else 0)
+
+    def event(self, msg):
+        self.events.append(time.strftime("%H:%M:%S ") + msg)
+        if not self.dashboard:
+            print (msg)
+
+    def previous(self, run, profile_path):
+        # Result of the run before this sweep, so that repetitions are not compared with each other
+        k = (profile_path, run.cmd)
+        if k not in self.baseline:
+            self.baseline[k] = last_result(profile_path, run.cmd, run.build.app)
+        return self.baseline[k]
+
+    def started(self, run):
+        self.running += 1
+
+    def sample(self, run, text, prev):
+        # One finished repetition: histograms, and comparison with previous()
+        t = timings(text, run.build.app)
+        for phase, ms in t.items():
+            self.samples[phase].append(ms)
+            self.counts[phase][bucket(ms)] += 1
+            self.sums[phase] += ms
+            old = prev.get(phase)
+            if old and ms > old * (1 + self.alert):
+                self.regressions += 1
+                self.event("REGRESSION " + run.build.app + " " + run.profile + " " + phase + ": %.3f ms -> %.3f ms (+%.0f%%)" % (old, ms, 100 * (ms / old - 1)))
+        if not t:
+            self.failed += 1
+            self.event("NO TIMINGS " + run.build.app + " " + run.profile)
+
+    def failed_run(self, run, outcome, text):
+        # One failed attempt (build-fail, verify-fail, timeout or crash), retried or not
+        self.outcomes[outcome.status] = self.outcomes.get(outcome.status, 0) + 1
+        self.event(outcome.status.upper() + " " + run.build.app + " " + run.profile + " after %.1f s" % outcome.wall)
+
+    def finished(self, run, seconds):
+        # One configuration completed (all its repetitions)
+        self.running -= 1
+        self.done += 1
+        self.busy += seconds
+        k = self.key(run)
+        self.durations.setdefault(k, []).append(seconds)
+        if k in self.pending_keys:
+            self.pending_keys.remove(k)
+
+    def repeated(self, run):
+        self.running -= 1
+
+    def expected(self, k, default):
+        if k in self.durations:
+            return stats.median(self.durations[k])
+        if k in self.past:
+            return stats.median(self.past[k])
+        return default
+
+    def eta(self):
+        # Remaining run time divided by the concurrency observed so far
+        everything = [s for v in self.durations.values() for s in v]
+        if not everything and not self.past:
+            return None
+        default = stats.median(everything or [s for v in self.past.values() for s in v])
+        remaining = sum(self.expected(k, default) for k in self.pending_keys)
+        elapsed = time.time() - self.start
+        concurrency = max(1.0, self.busy / elapsed) if elapsed > 0 else 1.0
+        return remaining / concurrency
+
+    def refresh(self, force=False):
+        now = time.time()
+        if not force and now - self.last_refresh < REFRESH:
+            return
+        self.last_refresh = now
+        if self.metrics_path is not None:
+            self.write_metrics()
+        if self.dashboard:
+            sys.stdout.write("\033[H\033[J" + self.render())
+            sys.stdout.flush()
+
+    def render(self):
+        remaining = self.total - self.done
+        out = ["PrIM sweep  %d/%d done, %d running, %d remaining, %d without timings, %d failed, %d regression(s)" % (self.done, self.total, self.running, remaining, self.failed, sum(self.outcomes.values()), self.regressions),
+               "elapsed %s  ETA %s" % (format_seconds(time.time() - self.start), format_seconds(self.eta())), ""]
+        for phase in PHASES:
+            v = list(self.samples[phase])
+            if not v:
+                continue
+            out.append("%-10s  n=%d  median %.3f ms  p90 %.3f ms" % (phase, len(v), stats.median(v), stats.quantile(v, 0.9)))
+            counts = histogram(v)
+            used = [i for i, c in enumerate(counts) if c]
+            peak = max(counts)
+            for i in range(used[0], used[-1] + 1):
+                label = ("<= %g" % BUCKETS[i]) if i < len(BUCKETS) else "> %g" % BUCKETS[-1]
+                out.append("  %12s ms |%-40s %d" % (label, "#" * int(round(40.0 * counts[i] / peak)), counts[i]))
+        out.append("")
+        out += list(self.events)
+        return "\n".join(out) + "\n"
+
+    def write_metrics(self):
+        lines = ["# TYPE prim_sweep_runs gauge"]
+        lines.append('prim_sweep_runs{state="done"} %d' % self.done)
+        lines.append('prim_sweep_runs{state="running"} %d' % self.running)
+        lines.append('prim_sweep_runs{state="remaining"} %d' % (self.total - self.done))
+        lines.append("# TYPE prim_sweep_runs_without_timings counter")
+        lines.append("prim_sweep_runs_without_timings %d" % self.failed)
+        lines.append("# TYPE prim_sweep_failed_runs counter")
+        for status, count in sorted(self.outcomes.items()):
+            lines.append('prim_sweep_failed_runs{status="%s"} %d' % (status, count))
+        lines.append("# TYPE prim_sweep_regressions counter")
+        lines.append("prim_sweep_regressions %d" % self.regressions)
+        eta = self.eta()
+        if eta is not None:
+            lines.append("# TYPE prim_sweep_eta_seconds gauge")
+            lines.append("prim_sweep_eta_seconds %f" % eta)
+        lines.append("# TYPE prim_sweep_phase_ms histogram")
+        for phase in PHASES:
+            cumulative = 0
+            for bound, count in zip(BUCKETS + [float("inf")], self.counts[phase]):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else "%g" % bound
+                lines.append('prim_sweep_phase_ms_bucket{phase="%s",le="%s"} %d' % (phase, le, cumulative))
+            lines.append('prim_sweep_phase_ms_sum{phase="%s"} %f' % (phase, self.sums[phase]))
+            lines.append('prim_sweep_phase_ms_count{phase="%s"} %d' % (phase, cumulative))
+        tmp = self.metrics_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.metrics_path)
@@ -0,0 +1,284 @@
+import os
+import re
+import sys
+from collections import namedtuple
+
+# Parser and columnar store for the profile/ files written by the run_*.py drivers.
+#
+# Each host program prints its timers through print(&timer, ...), e.g.
+#   CPU Time (ms): 1.5	CPU-DPU Time (ms): 0.4	DPU Kernel Time (ms): 16.2	DPU-CPU Time (ms): 0.1	DPU Energy (J): 0.3
+# Every timer becomes one Record. The sweep engine starts the output of each
+# run with a "Running = <cmd>" line, from which the input size is recovered.
+# Older profile files without that line are split at the first repeated phase.
+#
+# Timers named differently by some benchmarks are normalized to CPU, CPU-DPU,
+# DPU Kernel and DPU-CPU (APP_PHASES): several timers mapped to one phase are
+# summed into it and kept under their own names (e.g., the Scan and Add
+# kernels of SCAN-SSA), a single one is renamed.
+#
+# Usage: python3 results.py <rootdir> <results.npz>
+#        python3 results.py --check   (parses the output line of every host program)
+
+Record = namedtuple("Record", ["sweep", "app", "dpus", "tasklets", "bl", "size", "run", "phase", "ms", "energy"])
+
+RUN_MARKER = "Running = "
+SWEEPS = {"out" : "weak", "outs" : "strong_rank", "outss" : "strong_full"}
+PROFILE_RE = re.compile(r"^(outs?s?)_tl(\d+)_bl(\d+)_dpus(\d+)$")
+TIME_RE = re.compile(r"([A-Za-z][A-Za-z0-9\-]*(?: [A-Za-z0-9(][A-Za-z0-9\-()]*)*) ?Time ?\(ms\): *([-+]?(?:nan|inf|[0-9.]+(?:e[-+]?\d+)?))", re.I)
+ENERGY_RE = re.compile(r"Energy \(J\): *([-+]?[0-9.]+(?:e[-+]?\d+)?)", re.I)
+SIZE_FLAGS = ["-i", "-n", "-m", "-p"]
+PHASE_ALIASES = {"CPU Version" : "CPU", "CPU version" : "CPU"}
+APP_PHASES = {
+    "SCAN-SSA" : {"DPU Kernel Scan" : "DPU Kernel", "DPU Kernel Add" : "DPU Kernel"},
+    "SCAN-RSS" : {"DPU Kernel Reduction" : "DPU Kernel", "DPU Kernel Scan" : "DPU Kernel"},
+    "TRNS" : {"CPU-DPU (Step 1)" : "CPU-DPU", "Step 2" : "DPU Kernel", "Step 3" : "DPU Kernel"},
+}
+# Output line of the timers of every host program (verbosity 0, ENERGY=0), checked by check_parser()
+HOST_OUTPUT = {
+    "BFS" : "CPU-DPU Time(ms): 1.000000    DPU Kernel Time (ms): 2.000000    Inter-DPU Time (ms): 3.000000    DPU-CPU Time (ms): 4.000000",
+    "BS" : "CPU Version Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "GEMV" : "CPU Version Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "HST-L" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "HST-S" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "MLP" : "CPU Version Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tInter-DPU Time (ms): 5.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "NW" : "CPU version Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tInter-DPU Time (ms): 5.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "RED" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tInter-DPU Time (ms): 5.000000\t",
+    "SCAN-SSA" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Scan Time (ms): 1.000000\tInter-DPU (Scan) Time (ms): 5.000000\tDPU Kernel Add Time (ms): 2.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "SCAN-RSS" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Reduction Time (ms): 1.000000\tInter-DPU (Scan) Time (ms): 5.000000\tDPU Kernel Scan Time (ms): 2.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "SEL" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tInter-DPU Time (ms): 5.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "SpMV" : "CPU-DPU Time(ms): 2.000000    DPU Kernel Time (ms): 3.000000    DPU-CPU Time (ms): 4.000000",
+    "TRNS" : "CPU Time (ms): 1.000000\tCPU-DPU (Step 1) Time (ms): 2.000000\tStep 2 Time (ms): 1.000000\tStep 3 Time (ms): 2.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "TS" : "CPU Version Time (ms): 1.000000\tInter-DPU Time (ms): 5.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "UNI" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tInter-DPU Time (ms): 5.000000\tDPU-CPU Time (ms): 4.000000\t",
+    "VA" : "CPU Time (ms): 1.000000\tCPU-DPU Time (ms): 2.000000\tDPU Kernel Time (ms): 3.000000\tDPU-CPU Time (ms): 4.000000\t",
+}
+
+def parse_profile_name(name):
+    # "outs_tl16_bl10_dpus64" -> ("strong_rank", 64, 16, 10)
+    m = PROFILE_RE.match(name)
+    if m is None:
+        return None
+    return SWEEPS[m.group(1)], int(m.group(4)), int(m.group(2)), int(m.group(3))
+
+def command_size(cmd):
+    args = cmd.split()
+    for flag in SIZE_FLAGS:
+        if flag in args[:-1]:
+            return int(args[args.index(flag) + 1])
+    return -1
+
+def command_flags(cmd):
+    # Numeric values of the one-letter options: "-m 8192 -n 1024" -> {"m": 8192, "n": 1024}
+    args = cmd.split()
+    flags = {}
+    for flag, value in zip(args, args[1:]):
+        if len(flag) == 2 and flag[0] == "-" and flag[1].isalpha():
+            try:
+                flags[flag[1]] = int(value)
+            except ValueError:
+                try:
+                    flags[flag[1]] = float(value)
+                except ValueError:
+                    pass
+    return flags
+
+def normalize(app, timings):
+    # [(phase, ms)] printed by one run of 'app' -> with the phases of APP_PHASES
+    table = APP_PHASES.get(app, {})
+    targets = {}
+    for phase, ms in timings:
+        if phase in table:
+            targets.setdefault(table[phase], []).append((phase, ms))
+    out = []
+    for phase, ms in timings:
+        target = table.get(phase)
+        if target is None:
+            out.append((phase, ms))
+            continue
+        parts = targets[target]
+        if len(parts) > 1:
+            out.append((phase, ms))
+        if parts[-1][0] == phase:
+            out.append((target, sum(t for _, t in parts)))
+    return out
+
+def parse_lines(lines, sweep, app, dpus, tasklets, bl, first_run=0):
+    # Yields one Record per timer; 'run' numbers the runs found in the stream
+    run = first_run - 1
+    size = -1
+    timings = []
+    energy = float("nan")
+    seen = set()
+
+    def flush():
+        for phase, ms in normalize(app, timings):
+            yield Record(sweep, app, dpus, tasklets, bl, size, run, phase, ms, energy)
+
+    for line in lines:
+        if line.startswith(RUN_MARKER):
+            for r in flush(): yield r
+            run, timings, energy, seen = run + 1, [], float("nan"), set()
+            size = command_size(line[len(RUN_MARKER):])
+            continue
+        for m in TIME_RE.finditer(line):
+            phase = PHASE_ALIASES.get(m.group(1), m.group(1))
+            if phase in seen or run < first_run:
+                # Profile written without run markers, a repeated phase starts a new run
+                for r in flush(): yield r
+                run, timings, energy, seen = run + 1, [], float("nan"), set()
+            seen.add(phase)
+            timings.append((phase, float(m.group(2))))
+        m = ENERGY_RE.search(line)
+        if m is not None:
+            energy = float(m.group(1))
+    for r in flush(): yield r
+
+def parse_file(path, offset=0, first_run=0):
+    # Streams the records of one profile file, starting at byte 'offset'
+    info = parse_profile_name(os.path.basename(path))
+    if info is None:
+        return
+    sweep, dpus, tasklets, bl = info
+    app = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(path))))
+    with open(path, errors="replace") as f:
+        f.seek(offset)
+        for r in parse_lines(f, sweep, app, dpus, tasklets, bl, first_run):
+            yield r
+
+def run_blocks(path, cmd=None):
+    # Yields (cmd, output) for every run of a profile file written with run markers,
+    # only the runs of 'cmd' if given
+    if not os.path.exists(path):
+        return
+    current = None
+    lines = []
+    with open(path, errors="replace") as f:
+        for line in f:
+            if line.startswith(RUN_MARKER):
+                if current is not None and cmd in (None, current):
+                    yield current, "".join(lines)
+                current = line[len(RUN_MARKER):].strip()
+                lines = []
+            else:
+                lines.append(line)
+    if current is not None and cmd in (None, current):
+        yield current, "".join(lines)
+
+def profile_files(rootdir):
+    for app in sorted(os.listdir(rootdir)):
+        prof = os.path.join(rootdir, app, "profile")
+        if not os.path.isdir(prof):
+            continue
+        for name in sorted(os.listdir(prof)):
+            if parse_profile_name(name) is not None:
+                yield os.path.join(prof, name)
+
+# Columnar store: one array per Record field, string columns are dictionary encoded
+
+STRING_FIELDS = ["sweep", "app", "phase"]
+INT_FIELDS = ["dpus", "tasklets", "bl", "size", "run"]
+FLOAT_FIELDS = ["ms", "energy"]
+FORMAT = 2 # Stores of an older parser are parsed again from scratch
+
+def empty_columns():
+    return dict((f, []) for f in Record._fields)
+
+def append(columns, record):
+    for f, v in zip(Record._fields, record):
+        columns[f].append(v)
+
+def save(path, columns, sources):
+    # sources: {profile path: bytes already ingested}, used by update()
+    import numpy as np
+    arrays = {}
+    for f in STRING_FIELDS:
+        names, codes = np.unique(np.array(columns[f], dtype=str), return_inverse=True)
+        arrays[f + "_names"] = names
+        arrays[f] = codes.astype(np.uint16)
+    for f in INT_FIELDS:
+        arrays[f] = np.array(columns[f], dtype=np.int64)
+    for f in FLOAT_FIELDS:
+        arrays[f] = np.array(columns[f], dtype=np.float64)
+    arrays["source_paths"] = np.array(list(sources.keys()), dtype=str)
+    arrays["source_offsets"] = np.array(list(sources.values()), dtype=np.int64)
+    arrays["format"] = np.array(FORMAT)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+def load(path):
+    # Returns (table, sources); table maps every Record field to a NumPy array.
+    # sources is None if the store was written by an older parser.
+    import numpy as np
+    with np.load(path) as data:
+        table = {}
+        for f in STRING_FIELDS:
+            table[f] = data[f + "_names"][data[f]] if len(data[f]) else np.array([], dtype=str)
+        for f in INT_FIELDS + FLOAT_FIELDS:
+            table[f] = data[f]
+        sources = dict(zip(data["source_paths"].tolist(), data["source_offsets"].tolist()))
+        if "format" not in data or int(data["format"]) != FORMAT:
+            sources = None
+    return table, sources
+
+def select(table, **conditions):
+    # select(table, app="VA", phase="DPU Kernel", dpus=64) -> filtered table
+    import numpy as np
+    mask = np.ones(len(table["ms"]), dtype=bool)
+    for f, v in conditions.items():
+        mask &= table[f] == v
+    return dict((f, a[mask]) for f, a in table.items())
+
+def update(rootdir, path):
+    # Ingests only what was appended to the profile files since the last update
+    columns = empty_columns()
+    sources = {}
+    next_run = 0
+    if os.path.exists(path):
+        table, sources = load(path)
+    if sources is None:
+        print ("Parsing the profile files again, " + path + " was written by an older parser")
+        sources = {}
+    elif os.path.exists(path):
+        for f in Record._fields:
+            columns[f] = table[f].tolist()
+        next_run = max(columns["run"]) + 1 if columns["run"] else 0
+
+    added = 0
+    for prof in profile_files(rootdir):
+        size = os.path.getsize(prof)
+        offset = sources.get(prof, 0)
+        if size == offset:
+            continue
+        if size < offset:
+            offset = 0 # File was truncated or rewritten
+        for r in parse_file(prof, offset, next_run):
+            append(columns, r)
+            next_run = max(next_run, r.run + 1)
+            added += 1
+        sources[prof] = size
+    save(path, columns, sources)
+    return added, len(columns["ms"])
+
+def check_parser():
+    # Returns the host programs whose output line does not give CPU-DPU and DPU Kernel
+    failed = []
+    for app, line in sorted(HOST_OUTPUT.items()):
+        phases = dict((r.phase, r.ms) for r in parse_lines([RUN_MARKER + "./bin/host_code", line], None, app, 0, 0, 0))
+        ok = "CPU-DPU" in phases and "DPU Kernel" in phases
+        print (app + "\t" + ("ok" if ok else "FAILED") + "\t" + ", ".join("%s=%g" % kv for kv in phases.items()))
+        if not ok:
+            failed.append(app)
+    return failed
+
+def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "--check":
+        sys.exit(1 if check_parser() else 0)
+    if(len(sys.argv) < 3):
+        print ("Usage: python3 results.py rootdir results.npz")
+        return
+    added, total = update(sys.argv[1], sys.argv[2])
+    print ("Added " + str(added) + " record(s), " + str(total) + " in " + sys.argv[2])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import sys
+import argparse
+
+import numpy as np
+
+import results
+
+# Scaling efficiency of the strong and weak scaling sweeps, from the records
+# of results.py (the profile files are ingested first):
+#   strong_rank, strong_full  speedup T(d0) / T(d) and parallel efficiency
+#                             speedup / (d / d0), d0 the fewest DPUs of the
+#                             sweep (1 and 256), same input size
+#   weak                      efficiency T(d0) / T(d)
+# per phase (CPU-DPU, DPU Kernel, DPU-CPU, and their total), with the best
+# tasklets and bl of each number of DPUs (fastest median DPU Kernel time, or
+# the tasklets given with --tasklets).
+#
+# The crossover of a sweep is the number of DPUs from which CPU-DPU + DPU-CPU
+# transfers take longer than the DPU Kernel, interpolated between the
+# measured DPU counts on a log scale.
+#
+# Usage: python3 scaling.py [app ...] [--sweep weak] [--plot DIR]
+
+PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+TRANSFERS = ["CPU-DPU", "DPU-CPU"]
+TOTAL = "Total"
+GROUP = ["app", "sweep", "size", "dpus", "tasklets", "bl", "phase"]
+
+def medians(table):
+    # Median ms of every (app, sweep, size, dpus, tasklets, bl, phase), as columns
+    keep = np.isin(table["phase"], PHASES)
+    cols = [table[f][keep] for f in GROUP]
+    ms = table["ms"][keep]
+    if len(ms) == 0:
+        return dict((f, np.array([])) for f in GROUP + ["ms"])
+    order = np.lexsort([ms] + cols[::-1]) # Groups, then ms within each group
+    cols = [c[order] for c in cols]
+    ms = ms[order]
+    change = np.zeros(len(ms) - 1, dtype=bool)
+    for c in cols:
+        change |= c[1:] != c[:-1]
+    starts = np.concatenate(([0], np.nonzero(change)[0] + 1))
+    counts = np.diff(np.concatenate((starts, [len(ms)])))
+    med = 0.5 * (ms[starts + (counts - 1) // 2] + ms[starts + counts // 2])
+    out = dict((f, c[starts]) for f, c in zip(GROUP, cols))
+    out["ms"] = med
+    return out
+
+def curves(med, tasklets=None):
+    # {(app, sweep, size): {"dpus": array, "tasklets": array, "bl": array, phase: ms array}}
+    # Weak scaling sizes depend on the DPUs for some benchmarks, they are one curve (size -1)
+    configs = {}
+    for i in range(len(med["ms"])):
+        strong = med["sweep"][i] != "weak"
+        curve = (str(med["app"][i]), str(med["sweep"][i]), int(med["size"][i]) if strong else -1)
+        point = (int(med["tasklets"][i]), int(med["bl"][i]), int(med["size"][i]))
+        if tasklets is not None and point[0] != tasklets:
+            continue
+        configs.setdefault(curve, {}).setdefault(int(med["dpus"][i]), {}).setdefault(point, {})[str(med["phase"][i])] = float(med["ms"][i])
+    out = {}
+    for curve, by_dpus in configs.items():
+        rows = []
+        for dpus in sorted(by_dpus):
+            candidates = [(p, t) for p, t in by_dpus[dpus].items() if all(ph in t for ph in PHASES)]
+            if not candidates:
+                continue
+            point, t = min(candidates, key=lambda c: c[1]["DPU Kernel"])
+            rows.append((dpus, point[0], point[1]) + tuple(t[ph] for ph in PHASES))
+        if not rows:
+            continue
+        a = np.array(rows, dtype=np.float64)
+        c = {"dpus" : a[:, 0].astype(np.int64), "tasklets" : a[:, 1].astype(np.int64), "bl" : a[:, 2].astype(np.int64)}
+        for j, ph in enumerate(PHASES):
+            c[ph] = a[:, 3 + j]
+        c[TOTAL] = a[:, 3:].sum(axis=1)
+        out[curve] = c
+    return out
+
+def efficiency(curve, sweep_name):
+    # {phase: (speedup, efficiency)} arrays over the DPU counts of the curve
+    scale = curve["dpus"] / float(curve["dpus"][0])
+    out = {}
+    for ph in PHASES + [TOTAL]:
+        t = curve[ph]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speedup = t[0] / t
+        if sweep_name == "weak":
+            out[ph] = (speedup * scale, speedup) # Scaled speedup, efficiency
+        else:
+            out[ph] = (speedup, speedup / scale)
+    return out
+
+def crossover(curve):
+    # DPUs from which transfers take longer than the DPU Kernel: None if never,
+    # the first DPU count if always, else interpolated on log2(dpus)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.log(sum(curve[ph] for ph in TRANSFERS) / curve["DPU Kernel"])
+    above = np.nonzero(ratio >= 0)[0]
+    if len(above) == 0:
+        return None
+    i = above[0]
+    if i == 0:
+        return float(curve["dpus"][0])
+    x0, x1 = np.log2(curve["dpus"][i - 1]), np.log2(curve["dpus"][i])
+    r0, r1 = ratio[i - 1], ratio[i]
+    return float(2 ** (x0 + (x1 - x0) * (-r0) / (r1 - r0)))
+
+def report(all_curves, out=sys.stdout):
+    out.write("app\tsweep\tsize\tdpus\ttasklets\tbl\tphase\tms\tspeedup\tefficiency\n")
+    for (app_name, sweep_name, size), c in sorted(all_curves.items()):
+        eff = efficiency(c, sweep_name)
+        for ph in PHASES + [TOTAL]:
+            speedup, e = eff[ph]
+            for i in range(len(c["dpus"])):
+                out.write("%s\t%s\t%d\t%d\t%d\t%d\t%s\t%f\t%.3f\t%.3f\n" % (app_name, sweep_name, size, c["dpus"][i], c["tasklets"][i], c["bl"][i], ph, c[ph][i], speedup[i], e[i]))
+    out.write("\napp\tsweep\tsize\tcrossover_dpus\tlast_efficient_dpus\n")
+    for (app_name, sweep_name, size), c in sorted(all_curves.items()):
+        x = crossover(c)
+        # Largest DPU count where the total time still scales at >= 50% efficiency
+        e = efficiency(c, sweep_name)[TOTAL][1]
+        ok = c["dpus"][e >= 0.5]
+        out.write("%s\t%s\t%d\t%s\t%s\n" % (app_name, sweep_name, size, "never" if x is None else "%.0f" % x, str(ok.max()) if len(ok) else "-"))
+
+def plot(all_curves, out_dir):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print ("matplotlib is not installed, no plots")
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    for (app_name, sweep_name, size), c in sorted(all_curves.items()):
+        eff = efficiency(c, sweep_name)
+        fig, (ax_t, ax_e) = plt.subplots(1, 2, figsize=(10, 4))
+        for ph in PHASES + [TOTAL]:
+            ax_t.plot(c["dpus"], c[ph], marker="o", label=ph)
+            ax_e.plot(c["dpus"], eff[ph][1], marker="o", label=ph)
+        x = crossover(c)
+        for ax in [ax_t, ax_e]:
+            ax.set_xscale("log", base=2)
+            ax.set_xlabel("DPUs")
+            if x is not None:
+                ax.axvline(x, color="grey", linestyle="--")
+        ax_t.set_yscale("log")
+        ax_t.set_ylabel("Time (ms)")
+        ax_e.set_ylabel("Efficiency")
+        ax_e.axhline(1.0, color="grey", linewidth=0.5)
+        ax_t.legend(fontsize="small")
+        fig.suptitle(app_name + " " + sweep_name + ("" if size < 0 else " (size " + str(size) + ")"))
+        fig.tight_layout()
+        name = app_name + "_" + sweep_name + ("" if size < 0 else "_" + str(size)) + ".png"
+        fig.savefig(os.path.join(out_dir, name))
+        plt.close(fig)
+    print ("Plots written to " + out_dir)
+
+def main():
+    rootdir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(usage="python3 scaling.py [app ...] [options]")
+    parser.add_argument("apps", nargs="*", help="benchmarks (default: all)")
+    parser.add_argument("--root", default=rootdir, help="path to the repo")
+    parser.add_argument("--results", default=None, help="results file updated from the profile files (default: results.npz in the repo)")
+    parser.add_argument("--sweep", action="append", default=None, choices=list(results.SWEEPS.values()), help="sweeps (default: all)")
+    parser.add_argument("--tasklets", type=int, default=None, help="use this number of tasklets instead of the fastest")
+    parser.add_argument("--plot", default=None, metavar="DIR", help="write one plot per benchmark and sweep (needs matplotlib)")
+    args = parser.parse_args()
+
+    path = args.results or os.path.join(args.root, "results.npz")
+    results.update(args.root, path)
+    table, _ = results.load(path)
+    if args.apps:
+        table = dict((f, a[np.isin(table["app"], args.apps)]) for f, a in table.items())
+    if args.sweep:
+        table = dict((f, a[np.isin(table["sweep"], args.sweep)]) for f, a in table.items())
+    all_curves = curves(medians(table), args.tasklets)
+    report(all_curves)
+    if args.plot:
+        plot(all_curves, args.plot)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import math
+
+# Small statistics helpers for benchmark repetitions (no SciPy needed).
+
+Z95 = 1.959964
+
+def median(values):
+    s = sorted(values)
+    n = len(s)
+    if n == 0:
+        return float("nan")
+    if n % 2:
+        return s[n // 2]
+    return 0.5 * (s[n // 2 - 1] + s[n // 2])
+
+def quantile(values, q):
+    s = sorted(values)
+    if not s:
+        return float("nan")
+    pos = q * (len(s) - 1)
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+def median_ci(values, z=Z95):
+    # Distribution-free confidence interval of the median from order statistics
+    # (normal approximation of the binomial). Falls back to (min, max) for few samples.
+    s = sorted(values)
+    n = len(s)
+    if n == 0:
+        return float("nan"), float("nan")
+    half = z * math.sqrt(n) / 2
+    lo = int(math.floor(n / 2 - half))
+    hi = int(math.ceil(n / 2 + half)) - 1
+    return s[max(lo, 0)], s[min(hi, n - 1)]
+
+def outliers(values):
+    # Number of samples outside the Tukey fences (1.5 IQR)
+    if len(values) < 4:
+        return 0
+    q1 = quantile(values, 0.25)
+    q3 = quantile(values, 0.75)
+    iqr = q3 - q1
+    return sum(1 for v in values if v < q1 - 1.5 * iqr or v > q3 + 1.5 * iqr)
+
+def relative_width(values, z=Z95):
+    lo, hi = median_ci(values, z)
+    m = median(values)
+    if m == 0:
+        return 0.0 if hi == lo else float("inf")
+    return (hi - lo) / abs(m)
+
+def ranks(values):
+    # Ranks from 1, ties get the average of their ranks
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    r = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            r[order[k]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return r
+
+def mann_whitney(a, b):
+    # Two-sided Mann-Whitney U test, normal approximation with tie and continuity
+    # corrections. Returns (U of a, p-value); p is nan if a sample is empty.
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return float("nan"), float("nan")
+    r = ranks(list(a) + list(b))
+    u = sum(r[:n1]) - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    ties = {}
+    for v in list(a) + list(b):
+        ties[v] = ties.get(v, 0) + 1
+    var = n1 * n2 / 12.0 * ((n + 1) - sum(t ** 3 - t for t in ties.values()) / float(n * (n - 1)))
+    if var <= 0:
+        return u, 1.0 # All values equal
+    z = (abs(u - n1 * n2 / 2.0) - 0.5) / math.sqrt(var)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+def fdr(pvalues):
+    # Benjamini-Hochberg adjusted p-values (q-values), nan p-values are kept as nan
+    valid = sorted((p, i) for i, p in enumerate(pvalues) if not math.isnan(p))
+    q = [float("nan")] * len(pvalues)
+    m = len(valid)
+    running = 1.0
+    for rank in range(m, 0, -1):
+        p, i = valid[rank - 1]
+        running = min(running, p * m / rank)
+        q[i] = running
+    return q
@@ -0,0 +1,400 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import build_cache
+import golden
+import isolation
+import journal
+import progress
+import results
+import stats
+import sweep_spec
+import tune
+import workqueue
+
+# Sweep engine shared by run_weak.py, run_strong_rank.py and run_strong_full.py.
+#
+# A sweep is split in two phases:
+#   1. compile: every distinct (app, make macros) binary is built once, in a
+#      process pool, into its own out-of-tree directory <app>/build/<tag>/bin,
+#      or copied from the build cache when the same sources were built before
+#   2. execute: runs are scheduled against a budget of DPU ranks, so that
+#      configurations with few DPUs can share the machine. In adaptive mode a
+#      run is repeated until the confidence interval of its DPU Kernel and
+#      transfer times is narrow enough, or its time budget is spent.
+#
+# Progress, ETA and phase histograms are exported to a metrics file and, with
+# --dashboard, redrawn in the terminal (progress.py).
+#
+# Builds and runs are managed subprocesses (isolation.py) with a timeout, their
+# outcome (ok, build-fail, verify-fail, timeout, crash) and resource usage are
+# recorded, and failures are retried a bounded number of times. The output of
+# failed runs goes to <profile>.failed instead of the profile file.
+#
+# Benchmarks with a golden output cache (golden.py) can check their output
+# against it (--verify hash or sample) instead of recomputing it on CPU.
+#
+# Completed runs are recorded in a journal, a restarted sweep skips them.
+#
+# With --coordinator the planned runs are handed out to workers (--worker) on
+# other hosts through a shared queue folder (workqueue.py).
+#
+# Configurations tuned by tune.py replace the tasklets and bl axes of the
+# (benchmark, NR_DPUS, input size) found in the tuning database.
+
+DPUS_PER_RANK = 64
+BUILD_DIR = "build"
+LINKED_DIRS = ["data", "input"] # Input folders the host programs open relative to cwd
+
+Build = namedtuple("Build", ["app", "macros"])
+Run = namedtuple("Run", ["build", "cmd", "nr_dpus", "profile"])
+Adaptive = namedtuple("Adaptive", ["ci", "min_reps", "max_reps", "budget"])
+# timeout: seconds per run, timeouts: {app: seconds} overriding it, retries: per build and per run
+Limits = namedtuple("Limits", ["timeout", "timeouts", "build_timeout", "retries"])
+# mode: full, hash or sample check of the output of the benchmarks in 'apps', against the golden outputs in golden_dir
+Verify = namedtuple("Verify", ["mode", "golden_dir", "apps"])
+
+ADAPTIVE_PHASES = ["CPU-DPU", "DPU Kernel", "DPU-CPU"]
+FAILED_SUFFIX = ".failed"
+STATUS_MARKER = "Status = "
+
+def parse_make(make):
+    # "NR_DPUS=4 NR_TASKLETS=16 BL=10 make all" -> (("BL", "10"), ("NR_DPUS", "4"), ("NR_TASKLETS", "16"))
+    macros = []
+    for token in make.split():
+        if token == "make":
+            break
+        key, value = token.split("=", 1)
+        macros.append((key, value))
+    return tuple(sorted(macros))
+
+def build_tag(build):
+    return "_".join(k + "_" + v for k, v in build.macros)
+
+def build_dir(rootdir, build):
+    return os.path.join(rootdir, build.app, BUILD_DIR, build_tag(build))
+
+def ranks_needed(nr_dpus):
+    return max(1, -(-nr_dpus // DPUS_PER_RANK))
+
+def prepare_app(rootdir, app_name):
+    for d in ["profile", "log/host", BUILD_DIR]:
+        os.makedirs(os.path.join(rootdir, app_name, d), exist_ok=True)
+
+def run_timeout(limits, run):
+    if limits is None:
+        return None
+    return limits.timeouts.get(run.build.app, limits.timeout)
+
+def compile_one(rootdir, build, cache_dir=None, timeout=None, retries=0):
+    app_dir = os.path.join(rootdir, build.app)
+    out_dir = build_dir(rootdir, build)
+    os.makedirs(out_dir, exist_ok=True)
+    for d in LINKED_DIRS:
+        src = os.path.join(app_dir, d)
+        dst = os.path.join(out_dir, d)
+        if os.path.isdir(src) and not os.path.lexists(dst):
+            os.symlink(src, dst)
+
+    bin_dir = os.path.join(out_dir, "bin")
+    if cache_dir is not None:
+        key = build_cache.build_key(app_dir, build.macros)
+        if build_cache.fetch(cache_dir, key, bin_dir):
+            return build, isolation.OK, True
+
+    cmd = ["make", "all", "BUILDDIR=" + bin_dir]
+    cmd += [k + "=" + v for k, v in build.macros]
+    for attempt in range(retries + 1):
+        with open(os.path.join(out_dir, "build.log"), "w") as log:
+            outcome = isolation.classify_build(isolation.call(cmd, app_dir, log, timeout, shell=False))
+        if outcome.status == isolation.OK:
+            break
+    if cache_dir is not None and outcome.status == isolation.OK:
+        build_cache.store(cache_dir, key, bin_dir)
+    return build, outcome.status, False
+
+def compile_all(rootdir, builds, jobs=None, cache_dir=None, cache_size=None, limits=None):
+    # Returns {build: outcome status}
+    builds = list(dict.fromkeys(builds))
+    status = {}
+    hits = 0
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        timeout, retries = (None, 0) if limits is None else (limits.build_timeout, limits.retries)
+        futures = [pool.submit(compile_one, rootdir, b, cache_dir, timeout, retries) for b in builds]
+        for f in as_completed(futures):
+            build, ret, hit = f.result()
+            status[build] = ret
+            hits += hit
+            print ("Built = " + build.app + " " + build_tag(build) + (" [cached]" if hit else "") + (" [" + ret + ", see build.log]" if ret != isolation.OK else ""))
+    if cache_dir is not None:
+        evicted = 0
+        if cache_size is not None:
+            evicted = build_cache.evict(cache_dir, cache_size)
+        print ("Build cache: " + str(hits) + " hit(s), " + str(len(builds) - hits) + " miss(es), " + str(evicted) + " evicted")
+    return status
+
+def launch(rootdir, run, index, timeout=None, verify=None):
+    cwd = build_dir(rootdir, run.build)
+    out_name = os.path.join(cwd, "run_" + str(index) + ".out")
+    out = open(out_name, "w")
+    print ("Running = " + run.build.app + " -> " + run.cmd)
+    proc = isolation.Process(golden.command(verify, run), cwd, out, timeout)
+    return proc, out
+
+def finish(rootdir, run, out, outcome):
+    # Returns the output of the run and its classified outcome. The output of a
+    # failed run is appended to <profile>.failed, after a line with its outcome.
+    out.close()
+    with open(out.name, errors="replace") as f:
+        text = f.read()
+    outcome = isolation.classify_run(outcome, text)
+    name = run.profile if outcome.status == isolation.OK else run.profile + FAILED_SUFFIX
+    # Runs finish in any order, append the whole output at once so profile files never interleave
+    with open(os.path.join(rootdir, run.build.app, "profile", name), "a") as prof:
+        prof.write(results.RUN_MARKER + run.cmd + "\n")
+        if outcome.status != isolation.OK:
+            prof.write(STATUS_MARKER + isolation.describe(outcome) + "\n")
+        prof.write(text)
+        prof.flush()
+        os.fsync(prof.fileno())
+    os.remove(out.name)
+    return text, outcome
+
+def add_samples(samples, text, app=None):
+    for r in results.parse_lines(text.splitlines(), None, app, 0, 0, 0):
+        if r.phase in ADAPTIVE_PHASES:
+            samples.setdefault(r.phase, []).append(r.ms)
+
+def more_reps(adaptive, samples, reps, elapsed):
+    if not samples:
+        return False # Nothing parsed, the run failed
+    if reps < adaptive.min_reps:
+        return True
+    if reps >= adaptive.max_reps or elapsed >= adaptive.budget:
+        return False
+    return any(stats.relative_width(v) > adaptive.ci for v in samples.values())
+
+def report(rootdir, run, samples, reps):
+    lines = []
+    for phase in ADAPTIVE_PHASES:
+        if phase not in samples:
+            continue
+        v = samples[phase]
+        lo, hi = stats.median_ci(v)
+        lines.append(phase + "\tmedian (ms)\t%f\tci\t%f\t%f\treps\t%d\toutliers\t%d\n" % (stats.median(v), lo, hi, reps, stats.outliers(v)))
+    with open(os.path.join(rootdir, run.build.app, "profile", run.profile + ".stats"), "a") as f:
+        f.write(results.RUN_MARKER + run.cmd + "\n")
+        f.writelines(lines)
+    print ("Stats = " + run.build.app + " " + run.profile + "\n  " + "  ".join(lines).rstrip())
+
+def execute_all(rootdir, runs, ranks=None, adaptive=None, log=None, monitor=None, limits=None, verify=None):
+    # ranks=None keeps the old behavior: one run at a time, in plan order
+    pending = list(enumerate(runs))
+    running = []
+    samples = {}
+    reps = {}
+    failures = {}
+    usage = {}
+    first_start = {}
+    while pending or running:
+        used = sum(ranks_needed(r.nr_dpus) for _, r, _, _ in running)
+        for item in list(pending):
+            index, run = item
+            need = ranks_needed(run.nr_dpus)
+            if running and (ranks is None or used + need > ranks):
+                continue
+            proc, out = launch(rootdir, run, index, run_timeout(limits, run), verify)
+            first_start.setdefault(index, time.time())
+            if monitor is not None:
+                monitor.started(run)
+            running.append((proc, run, out, index))
+            pending.remove(item)
+            used += need
+        for entry in list(running):
+            proc, run, out, index = entry
+            outcome = proc.poll()
+            if outcome is None:
+                continue
+            if monitor is not None:
+                # Read before finish() appends this run to the profile
+                previous = monitor.previous(run, os.path.join(rootdir, run.build.app, "profile", run.profile))
+            text, outcome = finish(rootdir, run, out, outcome)
+            running.remove(entry)
+            cpu, max_rss = usage.get(index, (0.0, 0))
+            usage[index] = (cpu + outcome.cpu, max(max_rss, outcome.max_rss))
+            if outcome.status == isolation.OK:
+                if monitor is not None:
+                    monitor.sample(run, text, previous)
+                reps[index] = reps.get(index, 0) + 1
+                if adaptive is not None:
+                    add_samples(samples.setdefault(index, {}), text, run.build.app)
+                    if more_reps(adaptive, samples[index], reps[index], time.time() - first_start[index]):
+                        pending.insert(0, (index, run))
+                        if monitor is not None:
+                            monitor.repeated(run)
+                        continue
+                    if samples[index]:
+                        report(rootdir, run, samples[index], reps[index])
+            else:
+                failures[index] = failures.get(index, 0) + 1
+                retry = limits is not None and failures[index] <= limits.retries
+                print ("Failed = " + run.build.app + " " + run.profile + ": " + isolation.describe(outcome) + (" [retrying]" if retry else ""))
+                if monitor is not None:
+                    monitor.failed_run(run, outcome, text)
+                if retry:
+                    pending.insert(0, (index, run))
+                    if monitor is not None:
+                        monitor.repeated(run)
+                    continue
+            if log is not None:
+                journal.record(log, run, status=outcome.status, reps=reps.get(index, 0), failures=failures.get(index, 0), seconds=time.time() - first_start[index],
+                               cpu=usage[index][0], max_rss=usage[index][1], time=time.time())
+            if monitor is not None:
+                monitor.finished(run, time.time() - first_start[index])
+        if monitor is not None:
+            monitor.refresh()
+        if running:
+            time.sleep(0.1)
+    if monitor is not None:
+        monitor.refresh(force=True)
+
+def open_journal(runs, journal_path, fresh=False):
+    # Returns the runs not completed yet and the journal to record them, or (runs, None)
+    if journal_path is None:
+        return runs, None
+    if not fresh:
+        done = journal.load(journal_path)
+        left = [r for r in runs if journal.run_key(r) not in done]
+        if len(left) < len(runs):
+            print ("Journal: skipping " + str(len(runs) - len(left)) + " completed run(s)")
+        runs = left
+    return runs, journal.open_journal(journal_path, fresh)
+
+def run_sweep(rootdir, runs, jobs=None, ranks=None, cache_dir=None, cache_size=None, adaptive=None, journal_path=None, fresh=False, monitor=None, limits=None, verify=None):
+    # monitor: keyword arguments of progress.Progress, or an object with the same methods
+    runs, log = open_journal(runs, journal_path, fresh)
+    for app_name in dict.fromkeys(r.build.app for r in runs):
+        prepare_app(rootdir, app_name)
+
+    status = compile_all(rootdir, [r.build for r in runs], jobs, cache_dir, cache_size, limits)
+    runnable = [r for r in runs if status[r.build] == isolation.OK]
+    if len(runnable) < len(runs):
+        print ("Skipping " + str(len(runs) - len(runnable)) + " run(s) with failed builds")
+    if isinstance(monitor, dict):
+        monitor = progress.Progress(runnable, **monitor)
+    execute_all(rootdir, runnable, ranks, adaptive, log, monitor, limits, verify)
+    if log is not None:
+        log.close()
+
+def main(rootdir, sweep_name, specs=None):
+    # Command line of run_weak.py, run_strong_rank.py and run_strong_full.py
+    if specs is None:
+        specs = sweep_spec.load_specs()
+    parser = argparse.ArgumentParser(usage="python run.py application [options]")
+    parser.add_argument("application", nargs="?")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel builds")
+    parser.add_argument("-r", "--ranks", type=int, default=None, help="DPU ranks shared by concurrent runs (default: one run at a time)")
+    parser.add_argument("--cache", default=os.path.join(rootdir, ".build_cache"), help="build cache folder")
+    parser.add_argument("--cache-size", type=float, default=10, help="build cache size limit in GB")
+    parser.add_argument("--no-cache", action="store_true", help="always rebuild")
+    parser.add_argument("--adaptive", action="store_true", help="repeat each run until its timings are stable")
+    parser.add_argument("--ci", type=float, default=0.05, help="adaptive: target width of the 95%% CI of the median, relative to the median")
+    parser.add_argument("--min-reps", type=int, default=3, help="adaptive: minimum repetitions")
+    parser.add_argument("--max-reps", type=int, default=30, help="adaptive: maximum repetitions")
+    parser.add_argument("--budget", type=float, default=300, help="adaptive: time budget per configuration in seconds")
+    parser.add_argument("--journal", default=None, help="journal of completed runs (default: .<script>.journal in rootdir)")
+    parser.add_argument("--fresh", action="store_true", help="run again the runs completed in the journal (their timings are kept)")
+    parser.add_argument("--only", action="append", default=[], metavar="KEY=V1,V2", help="keep runs whose app, dpus, tasklets or bl is one of the values")
+    parser.add_argument("--shard", default=None, metavar="I/N", help="run the I-th of N shards of the plan (I from 0)")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan and its estimated time, do not build or run")
+    parser.add_argument("--dashboard", action="store_true", help="redraw progress, ETA and phase histograms in the terminal")
+    parser.add_argument("--metrics", default=None, help="metrics file in the Prometheus text format (default: .<script>.prom in rootdir)")
+    parser.add_argument("--alert", type=float, default=0.2, help="report runs slower than the previous result of their configuration by this fraction")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds before a run is killed (a spec can set its own 'timeout')")
+    parser.add_argument("--build-timeout", type=float, default=600, help="seconds before a build is killed")
+    parser.add_argument("--retries", type=int, default=2, help="retries of a failed build or run")
+    parser.add_argument("--verify", default="full", choices=list(golden.MODES), help="check of the outputs with a golden output: recompute it on CPU (full), or compare with its hash or a sample of it")
+    parser.add_argument("--golden", default=os.path.join(rootdir, ".golden"), help="golden output folder")
+    parser.add_argument("--coordinator", default=None, metavar="QUEUE", help="hand out the runs to workers through this (empty) shared folder")
+    parser.add_argument("--worker", default=None, metavar="QUEUE", help="run the work handed out by a coordinator in this shared folder")
+    parser.add_argument("--name", default=None, help="worker name (default: host name and process id)")
+    parser.add_argument("--dead-after", type=float, default=workqueue.DEAD_AFTER, help="seconds without heartbeat before the work of a worker is reassigned")
+    parser.add_argument("--tuning", default=os.path.join(rootdir, tune.DB), help="tuning database written by tune.py")
+    parser.add_argument("--no-tuning", action="store_true", help="sweep all tasklets and bl, ignore the tuning database")
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else args.cache
+    adaptive = None
+    if args.adaptive:
+        adaptive = Adaptive(args.ci, args.min_reps, args.max_reps, args.budget)
+    timeouts = dict((app_name, sweep_spec.section(spec, sweep_name)["timeout"]) for app_name, spec in specs.items() if "timeout" in sweep_spec.section(spec, sweep_name))
+    limits = Limits(args.timeout, timeouts, args.build_timeout, args.retries)
+    verify = Verify(args.verify, os.path.abspath(args.golden), [app_name for app_name, spec in specs.items() if spec.get("golden")])
+    if args.worker is not None:
+        workqueue.work(rootdir, args.worker, args.name, args.jobs, args.ranks, cache_dir, int(args.cache_size * 2**30), adaptive, limits, verify)
+        return
+
+    if args.application is None:
+        print ("Usage: python run.py application")
+        print ("Applications available: ")
+        for key, value in specs.items():
+            print (key )
+        print ("All")
+        return
+
+    print ("Application to run is: " + args.application )
+    if args.application == "All":
+        names = list(specs.keys())
+    elif args.application in specs:
+        names = [args.application]
+    else:
+        print ( "Application "+args.application+" not available" )
+        return
+
+    runs = []
+    for app_name in names:
+        print ("------------------------ Planning: "+app_name+"----------------------")
+        runs += sweep_spec.expand(specs[app_name], sweep_name, rootdir, app_name, not args.dry_run)
+    runs = list(dict.fromkeys(runs))
+    if not args.no_tuning:
+        runs = tune.apply(runs, tune.load_db(args.tuning))
+    runs = sweep_spec.filter_runs(runs, args.only)
+    if args.shard is not None:
+        index, count = args.shard.split("/")
+        runs = sweep_spec.shard(runs, int(index), int(count))
+
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    journal_path = args.journal
+    if journal_path is None:
+        journal_path = os.path.join(rootdir, "." + script + ".journal")
+
+    if args.dry_run:
+        if not args.fresh:
+            done = journal.load(journal_path)
+            runs = [r for r in runs if journal.run_key(r) not in done]
+        for run in runs:
+            print (run.build.app + "\t" + build_tag(run.build) + "\t" + run.cmd + "\t" + run.profile)
+        builds = len(set(r.build for r in runs))
+        wall, total = sweep_spec.estimate(runs, specs, sweep_name, [journal_path], args.ranks)
+        print (str(len(runs)) + " run(s), " + str(builds) + " build(s), estimated run time " + str(datetime.timedelta(seconds=int(wall))) + " (" + str(datetime.timedelta(seconds=int(total))) + " of runs)")
+        return
+
+    if args.coordinator is not None:
+        runs, log = open_journal(runs, journal_path, args.fresh)
+        workqueue.coordinate(rootdir, args.coordinator, runs, log, args.dead_after)
+        if log is not None:
+            log.close()
+        return
+
+    metrics_path = args.metrics
+    if metrics_path is None:
+        metrics_path = os.path.join(rootdir, "." + script + ".prom")
+    monitor = {"metrics_path" : metrics_path, "dashboard" : args.dashboard, "alert" : args.alert, "past" : sweep_spec.history([journal_path])}
+    run_sweep(rootdir, runs, args.jobs, args.ranks, cache_dir, int(args.cache_size * 2**30), adaptive, journal_path, args.fresh, monitor, limits, verify)
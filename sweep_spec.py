@@ -0,0 +1,160 @@
+import os
+import json
+import zlib
+
+try:
+    import tomllib
+except ImportError: # Python < 3.11
+    import tomli as tomllib
+
+import results
+import stats
+import sweep
+
+# Declarative sweep specifications: one TOML file per benchmark in specs/.
+#
+# Top-level keys apply to every sweep, and each sweep (weak, strong_rank,
+# strong_full) is a table that can override them:
+#   make     = "NR_DPUS={dpus} NR_TASKLETS={tasklets} BL={bl} make all"
+#   run      = "./bin/host_code -w 0 -e 1 -i {size} -x 0"
+#   dpus     = [1, 4, 16, 64]       # Axes of the sweep
+#   tasklets = [1, 2, 4, 8, 16]
+#   bl       = [10]
+#   seconds  = 10                   # Estimated time of one run, when there is no history
+#   timeout  = 3600                 # Seconds before a run is killed (default: --timeout)
+#   golden   = true                 # Host program with a golden output (-g, -c), see golden.py
+# Any other key is a parameter substituted in make and run, given either as
+#   size = 2621440                      fixed
+#   size = { per_dpu = 1024 }           proportional to the number of DPUs
+#   block = { formula = "2560 // dpus" } custom formula of dpus, tasklets and bl
+#   file = { generate = "weak" }        input generated by coo_generate.py
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "specs")
+PROFILE_PREFIX = dict((v, k) for k, v in results.SWEEPS.items())
+AXES = ["dpus", "tasklets", "bl"]
+RESERVED = AXES + ["make", "run", "seconds", "cpu", "model", "tune", "timeout", "golden"]
+DEFAULT_SECONDS = 10
+
+def load_specs(spec_dir=SPEC_DIR):
+    # Returns {app: spec}, in the order of the 'order' key of each spec
+    specs = {}
+    for name in os.listdir(spec_dir):
+        if name.endswith(".toml"):
+            with open(os.path.join(spec_dir, name), "rb") as f:
+                specs[name[:-len(".toml")]] = tomllib.load(f)
+    return dict(sorted(specs.items(), key=lambda kv: (kv[1].get("order", 0), kv[0])))
+
+def section(spec, sweep_name):
+    merged = dict((k, v) for k, v in spec.items() if not isinstance(v, dict) or k not in results.SWEEPS.values())
+    merged.update(spec.get(sweep_name, {}))
+    return merged
+
+def evaluate(rule, rootdir, app_name, values, create=True):
+    if not isinstance(rule, dict):
+        return rule
+    if "per_dpu" in rule:
+        return rule["per_dpu"] * values["dpus"]
+    if "formula" in rule:
+        return eval(rule["formula"], {"__builtins__" : {}}, dict(values))
+    if "generate" in rule:
+        import coo_generate # Needs NumPy, only for generated inputs
+        return coo_generate.weak_input(rootdir, app_name, values["dpus"], create=create)
+    raise ValueError("Unknown rule " + str(rule))
+
+def expand(spec, sweep_name, rootdir, app_name, create=True):
+    # Returns the deduplicated list of sweep.Run of one benchmark. With create=False
+    # generated inputs are only named, not written (dry runs).
+    s = section(spec, sweep_name)
+    if "run" not in s:
+        return []
+    params = dict((k, v) for k, v in s.items() if k not in RESERVED and k != "order")
+    runs = []
+    for r in s["dpus"]:
+        for t in s["tasklets"]:
+            for b in s.get("bl", [10]):
+                values = {"dpus" : r, "tasklets" : t, "bl" : b}
+                for k, rule in params.items():
+                    values[k] = evaluate(rule, rootdir, app_name, values, create)
+                m = s["make"].format(**values)
+                r_cmd = s["run"].format(**values)
+                profile = PROFILE_PREFIX[sweep_name] + "_tl"+str(t)+"_bl"+str(b)+"_dpus"+str(r)
+                runs.append(sweep.Run(sweep.Build(app_name, sweep.parse_make(m)), r_cmd, r, profile))
+    return list(dict.fromkeys(runs))
+
+def run_fields(run):
+    sweep_name, dpus, tasklets, bl = results.parse_profile_name(run.profile)
+    return {"app" : run.build.app, "sweep" : sweep_name, "dpus" : dpus, "tasklets" : tasklets, "bl" : bl}
+
+def total_size(run, default=-1):
+    # Total input size of a run: its -i/-n/-m/-p value (or 'default'), times the
+    # number of DPUs in weak scaling (-x 0) where that value is the size per DPU.
+    # -1 if unknown.
+    args = run.cmd.split()
+    size = results.command_size(run.cmd)
+    if size < 0:
+        size = default
+    exp = args[args.index("-x") + 1] if "-x" in args[:-1] else "1"
+    if size < 0 or exp not in ["0", "1"]:
+        return -1
+    return size * run.nr_dpus if exp == "0" else size
+
+def filter_runs(runs, conditions):
+    # conditions: ["app=VA,GEMV", "dpus=1,4"], a run is kept if it matches all of them
+    for cond in conditions:
+        key, values = cond.split("=", 1)
+        values = values.split(",")
+        runs = [r for r in runs if str(run_fields(r)[key]) in values]
+    return runs
+
+def shard(runs, index, count):
+    # Stable split by build, so that each binary is only built on one machine
+    return [r for r in runs if zlib.crc32(json.dumps([r.build.app, r.build.macros]).encode()) % count == index]
+
+def history(journal_paths):
+    # Observed run durations from sweep journals: {(app, dpus, tasklets): [seconds]}
+    seconds = {}
+    for path in journal_paths:
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "seconds" not in entry:
+                    continue
+                app, macros, cmd, profile = entry["run"]
+                info = results.parse_profile_name(profile)
+                if info is not None:
+                    seconds.setdefault((app, info[1], info[2]), []).append(entry["seconds"] / max(1, entry.get("reps", 1)))
+    return seconds
+
+def estimate(runs, specs, sweep_name, journal_paths, ranks=None):
+    # Estimated wall time of the execute phase, simulating the rank scheduler of sweep.py
+    past = history(journal_paths)
+    durations = []
+    for run in runs:
+        f = run_fields(run)
+        observed = past.get((f["app"], f["dpus"], f["tasklets"]))
+        if observed:
+            durations.append(stats.median(observed))
+        else:
+            durations.append(section(specs[f["app"]], sweep_name).get("seconds", DEFAULT_SECONDS))
+
+    now = 0.0
+    pending = list(zip(runs, durations))
+    running = [] # (end time, ranks)
+    while pending or running:
+        used = sum(n for _, n in running)
+        for item in list(pending):
+            need = sweep.ranks_needed(item[0].nr_dpus)
+            if running and (ranks is None or used + need > ranks):
+                continue
+            running.append((now + item[1], need))
+            pending.remove(item)
+            used += need
+        running.sort()
+        now = running[0][0]
+        running = [x for x in running if x[0] > now]
+    return now, sum(durations)
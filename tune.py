@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+
+import progress
+import results
+import stats
+import sweep
+import sweep_spec
+
+# Autotuner of the build parameters (NR_TASKLETS, BL, BL_IN, VERSION, ...) of
+# a benchmark, per number of DPUs and input size, by successive halving:
+# every candidate configuration runs 'reps' times, the best 1/eta of them
+# (median DPU Kernel time, or CPU-DPU + DPU Kernel + DPU-CPU with --metric
+# total) run eta times more, and so on until one is left. Each round is one
+# sweep: candidates are built in parallel and share the DPU ranks.
+#
+# The search space is NR_TASKLETS over the tasklets of the sweep, and BL over
+# SPACE["BL"], for the macros that the make command of the benchmark sets. A
+# [tune] table in the spec (or in one of its sweeps) replaces them or adds
+# other macros:
+#   [tune]
+#   BL_IN = [2, 4, 8]
+#   VERSION = ["SINGLE", "TREE"]
+#
+# The best configuration is stored in the tuning database (.tuning.json in the
+# repo), keyed by (benchmark, NR_DPUS, total input size), so that weak (-x 0,
+# size per DPU) and strong (-x 1) runs with the same -i are different targets.
+# Runs whose total input size is unknown are keyed by their command. The sweep drivers run the
+# tuned configuration of every (benchmark, NR_DPUS, input size) found there
+# instead of sweeping tasklets and bl, unless --no-tuning is given.
+#
+# Usage: python3 tune.py app [--sweep weak] [--only dpus=1,4] [--eta 3] [--dry-run]
+
+DB = ".tuning.json"
+SPACE = {"BL" : [6, 7, 8, 9, 10, 11]}
+PROFILE_PREFIX = "tune_"
+METRICS = {"kernel" : ["DPU Kernel"], "total" : ["CPU-DPU", "DPU Kernel", "DPU-CPU"]}
+
+def input_of(run):
+    # Total input size of a run, or its command if the size is unknown
+    size = sweep_spec.total_size(run)
+    return size if size >= 0 else run.cmd
+
+def db_key(app_name, nr_dpus, size):
+    return app_name + "/" + str(nr_dpus) + "/" + str(size)
+
+def load_db(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        db = json.load(f)
+    # Entries written before the keys were total input sizes have no "input"
+    stale = [k for k, entry in db.items() if "input" not in entry]
+    if stale:
+        print ("Tuning: ignoring " + str(len(stale)) + " entry(ies) of " + path + " keyed by the -i value, tune them again")
+    return dict((k, entry) for k, entry in db.items() if "input" in entry)
+
+def save_db(path, db):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(db, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def apply(runs, db):
+    # Replaces the build parameters of the runs found in the database by the
+    # tuned ones; the runs of the other configurations of the same target are dropped
+    tuned = []
+    for run in runs:
+        entry = db.get(db_key(run.build.app, run.nr_dpus, input_of(run)))
+        if entry is None:
+            tuned.append(run)
+            continue
+        old = dict(run.build.macros)
+        macros = dict(old, **entry["macros"])
+        prefix = run.profile.split("_")[0]
+        sweep_name, dpus, tasklets, bl = results.parse_profile_name(run.profile)
+        if "NR_TASKLETS" in macros:
+            tasklets = macros["NR_TASKLETS"]
+        if old.get("BL") == str(bl):
+            bl = macros["BL"] # The bl axis is the BL macro
+        profile = prefix + "_tl" + str(tasklets) + "_bl" + str(bl) + "_dpus" + str(dpus)
+        tuned.append(sweep.Run(sweep.Build(run.build.app, tuple(sorted(macros.items()))), run.cmd, run.nr_dpus, profile))
+    return list(dict.fromkeys(tuned))
+
+def search_space(spec, sweep_name, build):
+    # {macro: [values]} of the macros set by the make command of 'build'
+    s = sweep_spec.section(spec, sweep_name)
+    macros = dict(build.macros)
+    space = {}
+    if "NR_TASKLETS" in macros:
+        space["NR_TASKLETS"] = s["tasklets"]
+    for k, values in list(SPACE.items()) + list(s.get("tune", {}).items()):
+        if k in macros:
+            space[k] = values
+    return dict((k, [str(v) for v in values]) for k, values in space.items())
+
+def candidates(build, space, limit=None, seed=0):
+    keys = sorted(space)
+    builds = []
+    for combination in itertools.product(*[space[k] for k in keys]):
+        macros = dict(build.macros, **dict(zip(keys, combination)))
+        builds.append(sweep.Build(build.app, tuple(sorted(macros.items()))))
+    builds = list(dict.fromkeys(builds))
+    if limit is not None and len(builds) > limit:
+        builds = random.Random(seed).sample(builds, limit)
+    return builds
+
+def targets(spec, sweep_name, rootdir, app_name, conditions, create=True):
+    # One base run per (NR_DPUS, total input size) of the sweep
+    runs = sweep_spec.filter_runs(sweep_spec.expand(spec, sweep_name, rootdir, app_name, create), conditions)
+    bases = {}
+    for run in runs:
+        bases.setdefault((run.nr_dpus, input_of(run)), run)
+    return list(bases.values())
+
+def candidate_run(base, build):
+    return sweep.Run(build, base.cmd, base.nr_dpus, PROFILE_PREFIX + sweep.build_tag(build))
+
+def objective(rootdir, run, skip, phases):
+    # Median of the summed phases over the runs of this session (after 'skip' earlier ones)
+    path = os.path.join(rootdir, run.build.app, "profile", run.profile)
+    values = []
+    for i, (_, text) in enumerate(results.run_blocks(path, run.cmd)):
+        t = progress.timings(text, run.build.app)
+        if i >= skip and all(p in t for p in phases):
+            values.append(sum(t[p] for p in phases))
+    return (stats.median(values) if values else float("inf")), len(values)
+
+def successive_halving(rootdir, tasks, eta=3, reps=1, phases=METRICS["kernel"], sweep_args=()):
+    # tasks: {target: [candidate runs]}; returns {target: (best run, ms, reps)}
+    skip = {}
+    for runs in tasks.values():
+        for run in runs:
+            skip[run] = sum(1 for _ in results.run_blocks(os.path.join(rootdir, run.build.app, "profile", run.profile), run.cmd))
+    alive = dict((t, list(runs)) for t, runs in tasks.items())
+    done = dict((run, 0) for run in skip)
+    best = {}
+    rnd = 0
+    while alive:
+        want = reps * eta ** rnd
+        batch = []
+        for runs in alive.values():
+            for run in runs:
+                batch += [run] * (want - done[run])
+        print ("------------------------ Round " + str(rnd) + ": " + str(sum(len(r) for r in alive.values())) + " candidate(s), " + str(len(batch)) + " run(s) ----------------------")
+        sweep.run_sweep(rootdir, batch, *sweep_args)
+        for target, runs in list(alive.items()):
+            scored = []
+            for run in runs:
+                ms, n = objective(rootdir, run, skip[run], phases)
+                done[run] = want
+                scored.append((ms, run, n))
+            scored = sorted(s for s in scored if s[0] != float("inf"))
+            scored = scored[:max(1, len(scored) // eta)]
+            if len(scored) <= 1:
+                if scored:
+                    best[target] = (scored[0][1], scored[0][0], scored[0][2])
+                del alive[target]
+                continue
+            alive[target] = [s[1] for s in scored]
+        rnd += 1
+    return best
+
+def main():
+    rootdir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(usage="python3 tune.py app [options]")
+    parser.add_argument("apps", nargs="+", help="benchmarks to tune")
+    parser.add_argument("--sweep", default="weak", choices=list(results.SWEEPS.values()), help="sweep whose DPU counts and inputs are tuned")
+    parser.add_argument("--only", action="append", default=[], metavar="KEY=V1,V2", help="keep targets whose dpus is one of the values")
+    parser.add_argument("--eta", type=int, default=3, help="keep the best 1/eta candidates after each round")
+    parser.add_argument("--reps", type=int, default=1, help="repetitions of each candidate in the first round")
+    parser.add_argument("--max-configs", type=int, default=None, help="random sample of the candidates per target")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the sample")
+    parser.add_argument("--metric", default="kernel", choices=list(METRICS.keys()), help="DPU Kernel time, or with transfers")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel builds")
+    parser.add_argument("-r", "--ranks", type=int, default=None, help="DPU ranks shared by concurrent runs (default: one run at a time)")
+    parser.add_argument("--cache", default=os.path.join(rootdir, ".build_cache"), help="build cache folder")
+    parser.add_argument("--cache-size", type=float, default=10, help="build cache size limit in GB")
+    parser.add_argument("--no-cache", action="store_true", help="always rebuild")
+    parser.add_argument("--tuning", default=os.path.join(rootdir, DB), help="tuning database")
+    parser.add_argument("--dry-run", action="store_true", help="print the targets and their candidates, do not build or run")
+    args = parser.parse_args()
+
+    specs = sweep_spec.load_specs()
+    tasks = {}
+    spaces = {}
+    for app_name in args.apps:
+        if app_name not in specs:
+            print ("Application " + app_name + " not available")
+            return 1
+        for base in targets(specs[app_name], args.sweep, rootdir, app_name, args.only, not args.dry_run):
+            space = search_space(specs[app_name], args.sweep, base.build)
+            builds = candidates(base.build, space, args.max_configs, args.seed)
+            target = (app_name, base.nr_dpus, input_of(base))
+            tasks[target] = [candidate_run(base, b) for b in builds]
+            spaces[target] = space
+            print (app_name + "\tdpus " + str(base.nr_dpus) + "\t" + base.cmd + "\t" + str(len(builds)) + " candidate(s)\t" +
+                   " ".join(k + "=" + ",".join(v) for k, v in sorted(space.items())))
+
+    if args.dry_run:
+        return 0
+    cache_dir = None if args.no_cache else args.cache
+    sweep_args = (args.jobs, args.ranks, cache_dir, int(args.cache_size * 2**30))
+    best = successive_halving(rootdir, tasks, args.eta, args.reps, METRICS[args.metric], sweep_args)
+
+    db = load_db(args.tuning)
+    for (app_name, nr_dpus, size), (run, ms, n) in sorted(best.items(), key=lambda kv: str(kv[0])):
+        macros = dict((k, v) for k, v in run.build.macros if k in spaces[(app_name, nr_dpus, size)])
+        db[db_key(app_name, nr_dpus, size)] = {"macros" : macros, "input" : size, "metric" : args.metric, "ms" : ms, "reps" : n, "time" : time.time()}
+        print ("Tuned = " + app_name + " dpus " + str(nr_dpus) + " size " + str(size) + ": " + sweep.build_tag(run.build) + " (%f ms, %d reps)" % (ms, n))
+    save_db(args.tuning, db)
+    missing = [k for k in tasks if k not in best]
+    for app_name, nr_dpus, size in missing:
+        print ("No candidate of " + app_name + " dpus " + str(nr_dpus) + " size " + str(size) + " produced timings")
+    return 1 if missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import socket
+import threading
+
+import isolation
+import journal
+import results
+import sweep
+
+# Coordinator / worker mode of the sweep drivers, through a queue folder that
+# all hosts can reach (e.g., NFS), or a local folder for workers on one host:
+#   todo/<item>.json            planned work: the runs of one build
+#   claimed/<worker>/<item>.json  item taken by a worker (atomic rename)
+#   workers/<worker>.json       host and repo of a worker; its modification
+#                               time is the heartbeat of the worker
+#   results/<item>.<worker>.jsonl  results streamed by the worker, one JSON
+#                               line per repetition, failure and finished run,
+#                               with the output of repetitions and failures
+#   finished                    written by the coordinator at the end
+#
+# The coordinator appends the output of every finished run to its own profile
+# files (failed attempts to <profile>.failed) and journal. Items claimed by a worker without heartbeat for
+# --dead-after seconds go back to todo/ with their unfinished runs.
+#
+# Coordinator: python3 run_strong_full.py All --coordinator /shared/queue
+# Worker:      python3 run_strong_full.py --worker /shared/queue [-r 4]
+
+HEARTBEAT = 5.0
+DEAD_AFTER = 60.0
+POLL = 1.0
+DIRS = ["todo", "claimed", "workers", "results"]
+
+def run_to_json(run):
+    return [run.build.app, [list(m) for m in run.build.macros], run.cmd, run.nr_dpus, run.profile]
+
+def run_from_json(r):
+    return sweep.Run(sweep.Build(r[0], tuple(tuple(m) for m in r[1])), r[2], r[3], r[4])
+
+def write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def plan(queue, runs):
+    # One item per build, so that each binary is only built by one worker.
+    # Returns {item: {run index: run}}
+    for d in DIRS:
+        os.makedirs(os.path.join(queue, d), exist_ok=True)
+    builds = list(dict.fromkeys(r.build for r in runs))
+    items = {}
+    for i, build in enumerate(builds):
+        item = "%06d" % i
+        items[item] = dict((j, r) for j, r in enumerate(r for r in runs if r.build == build))
+        write_json(os.path.join(queue, "todo", item + ".json"), {"item" : item, "runs" : [[j, run_to_json(r)] for j, r in items[item].items()]})
+    return items
+
+class Stream:
+    # Monitor of sweep.execute_all that streams the results of a worker to the queue
+
+    def __init__(self, queue, item, worker, indexed_runs):
+        self.item = item
+        self.worker = worker
+        self.index = dict((run, j) for j, run in indexed_runs)
+        self.status = {}
+        self.done = set()
+        self.out = open(os.path.join(queue, "results", item + "." + worker + ".jsonl"), "a")
+
+    def write(self, run, kind, **info):
+        entry = dict(info, item=self.item, run=self.index[run], worker=self.worker, kind=kind)
+        self.out.write(json.dumps(entry) + "\n")
+        self.out.flush()
+        os.fsync(self.out.fileno())
+
+    def previous(self, run, profile_path):
+        return {}
+
+    def started(self, run):
+        pass
+
+    def sample(self, run, text, prev):
+        self.status[run] = isolation.OK
+        self.write(run, "output", text=text)
+
+    def failed_run(self, run, outcome, text):
+        self.status[run] = outcome.status
+        self.write(run, "failed", status=isolation.describe(outcome), text=text)
+
+    def repeated(self, run):
+        pass
+
+    def finished(self, run, seconds):
+        self.done.add(run)
+        self.write(run, "finished", status=self.status.get(run, isolation.OK), seconds=seconds)
+
+    def refresh(self, force=False):
+        pass
+
+    def close(self):
+        # Runs skipped because their build failed
+        for run in self.index:
+            if run not in self.done:
+                self.write(run, "finished", status=isolation.BUILD_FAIL, seconds=0.0)
+        self.out.close()
+
+def heartbeat(path, info, stop):
+    while True:
+        write_json(path, info)
+        if stop.wait(HEARTBEAT):
+            return
+
+def work(rootdir, queue, name=None, jobs=None, ranks=None, cache_dir=None, cache_size=None, adaptive=None, limits=None, verify=None):
+    # Claims and runs items until the coordinator is finished
+    name = name or socket.gethostname() + "-" + str(os.getpid())
+    for d in DIRS: # Workers may start before the coordinator
+        os.makedirs(os.path.join(queue, d), exist_ok=True)
+    claimed = os.path.join(queue, "claimed", name)
+    beat_path = os.path.join(queue, "workers", name + ".json")
+    info = {"host" : socket.gethostname(), "root" : os.path.abspath(rootdir)}
+    write_json(beat_path, info) # Alive before claiming anything
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat, args=(beat_path, info, stop))
+    beat.daemon = True
+    beat.start()
+    try:
+        while True:
+            os.makedirs(claimed, exist_ok=True) # Removed if this worker was taken for dead
+            item_path = None
+            for f in sorted(os.listdir(os.path.join(queue, "todo"))):
+                try:
+                    os.rename(os.path.join(queue, "todo", f), os.path.join(claimed, f))
+                except OSError:
+                    continue # Taken by another worker
+                item_path = os.path.join(claimed, f)
+                break
+            if item_path is None:
+                if os.path.exists(os.path.join(queue, "finished")):
+                    return
+                time.sleep(POLL)
+                continue
+            with open(item_path) as f:
+                item = json.load(f)
+            indexed = [(j, run_from_json(r)) for j, r in item["runs"]]
+            print ("------------------------ Worker " + name + ": item " + item["item"] + " (" + str(len(indexed)) + " run(s)) ----------------------")
+            stream = Stream(queue, item["item"], name, indexed)
+            for app_name in dict.fromkeys(r.build.app for _, r in indexed):
+                sweep.prepare_app(rootdir, app_name)
+            sweep.run_sweep(rootdir, [r for _, r in indexed], jobs, ranks, cache_dir, cache_size, adaptive, None, False, stream, limits, verify)
+            stream.close()
+            if os.path.exists(item_path):
+                os.remove(item_path)
+    finally:
+        stop.set()
+
+def dead_workers(queue, dead_after):
+    now = time.time()
+    dead = []
+    for name in os.listdir(os.path.join(queue, "claimed")):
+        beat = os.path.join(queue, "workers", name + ".json")
+        if not os.path.exists(beat) or now - os.path.getmtime(beat) > dead_after:
+            dead.append(name)
+    return dead
+
+def same_repo(queue, worker, rootdir):
+    # True if the worker runs in this repo, so its profile files are already ours
+    try:
+        with open(os.path.join(queue, "workers", worker + ".json")) as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return info["host"] == socket.gethostname() and info["root"] == os.path.abspath(rootdir)
+
+def ingest(rootdir, run, outputs, status, local):
+    # Appends the output of a finished run to the profile (or <profile>.failed) of the coordinator
+    if local:
+        return
+    for kind, text in outputs:
+        name = run.profile if kind == isolation.OK else run.profile + sweep.FAILED_SUFFIX
+        with open(os.path.join(rootdir, run.build.app, "profile", name), "a") as prof:
+            prof.write(results.RUN_MARKER + run.cmd + "\n")
+            if kind != isolation.OK:
+                prof.write(sweep.STATUS_MARKER + kind + "\n")
+            prof.write(text)
+
+def coordinate(rootdir, queue, runs, log=None, dead_after=DEAD_AFTER):
+    # Workers started first create the empty folders and their heartbeats
+    if os.path.exists(os.path.join(queue, "finished")) or any(os.listdir(os.path.join(queue, d)) for d in ["todo", "results"] if os.path.isdir(os.path.join(queue, d))):
+        print ("Queue folder " + queue + " holds a previous sweep, remove it or use another one")
+        return False
+    for app_name in dict.fromkeys(r.build.app for r in runs):
+        sweep.prepare_app(rootdir, app_name)
+    dead_after = max(dead_after, 2 * HEARTBEAT) # Not shorter than the heartbeats of live workers
+    items = plan(queue, runs)
+    remaining = dict((item, set(r)) for item, r in items.items())
+    total = len(runs)
+    offsets = {}
+    buffers = {}
+    print ("Coordinator: " + str(total) + " run(s) in " + str(len(items)) + " item(s), queue " + queue)
+    while any(remaining.values()):
+        for name in sorted(os.listdir(os.path.join(queue, "results"))):
+            path = os.path.join(queue, "results", name)
+            with open(path, "rb") as f:
+                f.seek(offsets.get(path, 0))
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1] # A line being written is read next time
+            offsets[path] = offsets.get(path, 0) + len(complete)
+            for line in complete.decode(errors="replace").splitlines():
+                entry = json.loads(line)
+                item, index, worker = entry["item"], entry["run"], entry["worker"]
+                key = (item, index, worker)
+                if entry["kind"] == "output":
+                    buffers.setdefault(key, []).append((isolation.OK, entry["text"]))
+                elif entry["kind"] == "failed":
+                    buffers.setdefault(key, []).append((entry["status"], entry["text"]))
+                elif index in remaining[item]:
+                    run = items[item][index]
+                    ingest(rootdir, run, buffers.pop(key, []), entry["status"], same_repo(queue, worker, rootdir))
+                    remaining[item].discard(index)
+                    if log is not None:
+                        journal.record(log, run, status=entry["status"], seconds=entry["seconds"], worker=worker, time=time.time())
+                    done = total - sum(len(r) for r in remaining.values())
+                    print ("Done = %d/%d %s %s on %s (%s)" % (done, total, run.build.app, run.profile, worker, entry["status"]))
+                else:
+                    buffers.pop(key, None) # Duplicate of a reassigned run
+        for worker in dead_workers(queue, dead_after):
+            claimed = os.path.join(queue, "claimed", worker)
+            for f in os.listdir(claimed):
+                item = f[:-len(".json")]
+                if remaining.get(item):
+                    left = sorted(remaining[item])
+                    write_json(os.path.join(queue, "todo", f), {"item" : item, "runs" : [[j, run_to_json(items[item][j])] for j in left]})
+                    print ("Reassigning item " + item + " (" + str(len(left)) + " run(s)) of dead worker " + worker)
+                os.remove(os.path.join(claimed, f))
+            try:
+                os.rmdir(claimed)
+            except OSError:
+                pass # Claimed something meanwhile, checked again next time
+        time.sleep(POLL)
+    write_json(os.path.join(queue, "finished"), {"time" : time.time()})
+    print ("Coordinator: all runs done")
+    return True